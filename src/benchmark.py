@@ -0,0 +1,283 @@
+import argparse
+import inspect
+import os
+import random
+import time
+
+from constants import AVAILABLE_GAME_TYPES, AVAILABLE_PLAYER_TYPES
+from games.connect4.batch_evaluator import evaluate_boards, get_boards
+from games.connect4.bitboard_state import Connect4BitboardState
+from games.connect4.state import Connect4State
+from games.hlpoker.state import HLPokerState
+from games.minesweeper.state import MinesweeperState
+
+"""
+Builds the initial state of each game, for the benchmarks that search its game tree
+"""
+INITIAL_STATES = {
+    "hlpoker":      lambda: HLPokerState(2),
+    "connect4":     Connect4State,
+    "connect4-bitboard": Connect4BitboardState,
+    "minesweeper":  MinesweeperState,
+}
+
+
+def benchmark_throughput(game, player_classes, num_games, seed):
+    random.seed(seed)
+
+    players = [player_class(f"{player_class.__name__} {index}") for index, player_class in enumerate(player_classes)]
+    simulator = game(players)
+
+    start = time.perf_counter()
+    for _ in range(num_games):
+        simulator.run_simulation()
+        simulator.change_player_positions()
+    elapsed = time.perf_counter() - start
+
+    print(f"Throughput: {' VS '.join(player_class.__name__ for player_class in player_classes)}")
+    print(f"{num_games} games in {elapsed:.3f}s | {num_games / elapsed:.1f} games/s")
+
+
+def count_nodes_with_clones(state, depth):
+    if depth == 0 or state.is_finished():
+        return 1
+    nodes = 1
+    for action in list(state.get_possible_actions()):
+        next_state = state.clone()
+        next_state.update(action)
+        nodes += count_nodes_with_clones(next_state, depth - 1)
+    return nodes
+
+
+def count_nodes_in_place(state, depth):
+    if depth == 0 or state.is_finished():
+        return 1
+    nodes = 1
+    for action in list(state.get_possible_actions()):
+        state.push(action)
+        nodes += count_nodes_in_place(state, depth - 1)
+        state.pop()
+    return nodes
+
+
+def benchmark_nodes(game_type, depth, seed):
+    # the walks visit every node of the game tree up to the depth, either cloning the state for each child or
+    # updating it in place with push and pop
+    for label, count_nodes in (('clone', count_nodes_with_clones), ('push/pop', count_nodes_in_place)):
+        random.seed(seed)
+        state = INITIAL_STATES[game_type]()
+
+        start = time.perf_counter()
+        nodes = count_nodes(state, depth)
+        elapsed = time.perf_counter() - start
+
+        print(f"Nodes ({label}): {game_type} up to depth {depth}")
+        print(f"{nodes} nodes in {elapsed:.3f}s | {nodes / elapsed:.1f} nodes/s")
+
+
+def benchmark_leaves(num_boards, seed):
+    random.seed(seed)
+
+    # positions reached with random moves, with any number of checkers
+    states = []
+    while len(states) < num_boards:
+        state = Connect4State()
+        for _ in range(random.randint(0, state.get_num_rows() * state.get_num_cols())):
+            if state.is_finished():
+                break
+            state.update(random.choice(state.get_possible_actions()))
+        states.append(state)
+
+    start = time.perf_counter()
+    for state in states:
+        for piece in (0, 1):
+            state.score_position(state.get_grid(), piece)
+    elapsed = time.perf_counter() - start
+    print(f"Leaves (score_position): {num_boards} boards in {elapsed:.3f}s | {num_boards / elapsed:.1f} boards/s")
+
+    start = time.perf_counter()
+    evaluate_boards(get_boards(states))
+    elapsed = time.perf_counter() - start
+    print(f"Leaves (batched): {num_boards} boards in {elapsed:.3f}s | {num_boards / elapsed:.1f} boards/s")
+
+
+def benchmark_search(game_type, player_class, depth, num_positions, seed, move_ordering):
+    random.seed(seed)
+
+    # positions reached with random moves, where the player is going to act
+    states = []
+    while len(states) < num_positions:
+        state = INITIAL_STATES[game_type]()
+        for _ in range(random.randint(0, 2 * depth)):
+            if state.is_finished():
+                break
+            state.update(random.choice(list(state.get_possible_actions())))
+        if not state.is_finished():
+            states.append(state)
+
+    nodes = 0
+    start = time.perf_counter()
+    for state in states:
+        # a new player for each position, so every search starts from scratch
+        player = player_class(player_class.__name__, max_depth=depth, move_ordering=move_ordering)
+        player.set_current_pos(state.get_acting_player())
+        player.get_action(state)
+        nodes += player.get_num_nodes()
+    elapsed = time.perf_counter() - start
+
+    print(f"Search: {player_class.__name__} at depth {depth} ({'with' if move_ordering else 'without'} move ordering)")
+    print(f"{num_positions} moves in {elapsed:.3f}s | {nodes / num_positions:.1f} nodes/move | "
+          f"{1000 * elapsed / num_positions:.1f} ms/move")
+
+
+def benchmark_parallel(game_type, player_class, move_time, num_positions, workers, seed):
+    random.seed(seed)
+
+    # positions reached with random moves, where the player is going to act
+    states = []
+    while len(states) < num_positions:
+        state = INITIAL_STATES[game_type]()
+        for _ in range(random.randint(0, 10)):
+            if state.is_finished():
+                break
+            state.update(random.choice(list(state.get_possible_actions())))
+        if not state.is_finished():
+            states.append(state)
+
+    print(f"Parallel search: {player_class.__name__} with {move_time:g}ms per move ({os.cpu_count()} CPUs)")
+    for num_workers in sorted({1, workers}):
+        player = player_class(player_class.__name__, move_time=move_time, workers=num_workers)
+
+        # the first move starts the helpers, so it isn't measured
+        player.set_current_pos(states[0].get_acting_player())
+        player.get_action(states[0])
+
+        nodes = player.get_num_nodes()
+        depth = 0
+        start = time.perf_counter()
+        for state in states:
+            player.set_current_pos(state.get_acting_player())
+            player.get_action(state)
+            depth += player.get_depth_reached()
+        elapsed = time.perf_counter() - start
+
+        print(f"{num_workers} worker(s): {(player.get_num_nodes() - nodes) / elapsed:.0f} nodes/s | "
+              f"{depth / num_positions:.2f} avg. depth | {1000 * elapsed / num_positions:.1f} ms/move")
+        if player.smp is not None:
+            player.smp.close()
+
+
+def find_player_class(parser, game_type, type_name):
+    for cls in AVAILABLE_PLAYER_TYPES[game_type]:
+        if cls.__name__ == type_name:
+            return cls
+    parser.error(f"Player type '{type_name}' is not available for game '{game_type}'.")
+
+
+"""
+Checks that a player class can be used by a benchmark that builds it with some arguments and calls some methods of it
+"""
+def check_player_class(parser, player_class, arguments, methods):
+    parameters = inspect.signature(player_class).parameters.values()
+    if not any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters):
+        names = [parameter.name for parameter in parameters]
+        arguments = [argument for argument in arguments if argument not in names]
+        if arguments:
+            parser.error(f"Player type '{player_class.__name__}' doesn't accept {', '.join(arguments)}.")
+
+    methods = [method for method in methods if not hasattr(player_class, method)]
+    if methods:
+        parser.error(f"Player type '{player_class.__name__}' doesn't implement {', '.join(methods)}.")
+    return player_class
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the performance of the simulators and players.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    # Games per second of a simulator with a pair of players
+    throughput = subparsers.add_parser('throughput', help='Number of games per second between two players.')
+    throughput.add_argument('--game', required=True, choices=AVAILABLE_GAME_TYPES.keys(),
+                            help='Type of game to simulate.')
+    throughput.add_argument('--players', required=True, nargs=2, metavar=('TYPE', 'TYPE'),
+                            help='The types of the two players.')
+    throughput.add_argument('--num-games', type=int, default=1000,
+                            help='Number of games to play. Defaults to 1000.')
+    throughput.add_argument('--seed', type=int, default=0,
+                            help='Seed for the random number generator. Defaults to 0.')
+
+    # Nodes per second when walking the game tree
+    nodes = subparsers.add_parser('nodes', help='Number of game tree nodes visited per second, with clones and '
+                                                'with push/pop.')
+    nodes.add_argument('--game', required=True, choices=AVAILABLE_GAME_TYPES.keys(),
+                       help='Type of game to search.')
+    nodes.add_argument('--depth', type=int, default=4,
+                       help='Number of actions searched from the initial state. Defaults to 4.')
+    nodes.add_argument('--seed', type=int, default=0,
+                       help='Seed for the random number generator. Defaults to 0.')
+
+    # Connect4 boards scored per second, one by one and in a batch
+    leaves = subparsers.add_parser('leaves', help='Number of Connect4 boards scored per second by score_position '
+                                                  'and by the batched evaluator.')
+    leaves.add_argument('--num-boards', type=int, default=20000,
+                        help='Number of boards to score. Defaults to 20000.')
+    leaves.add_argument('--seed', type=int, default=0,
+                        help='Seed for the random number generator. Defaults to 0.')
+
+    # Nodes searched per move by a search player
+    search = subparsers.add_parser('search', help='Number of nodes searched per move by a search player at a fixed '
+                                                  'depth.')
+    search.add_argument('--game', required=True, choices=AVAILABLE_GAME_TYPES.keys(),
+                        help='Type of game to search.')
+    search.add_argument('--player', default='MiniMaxConnect4Player',
+                        help='The type of the player. It must accept max_depth and move_ordering and count its nodes '
+                             '(get_num_nodes). Defaults to MiniMaxConnect4Player.')
+    search.add_argument('--depth', type=int, default=4,
+                        help='Depth of the search. Defaults to 4.')
+    search.add_argument('--num-positions', type=int, default=50,
+                        help='Number of positions searched. Defaults to 50.')
+    search.add_argument('--no-move-ordering', action='store_true', default=False,
+                        help='Sort the actions only by their distance to the center. Defaults to False.')
+    search.add_argument('--seed', type=int, default=0,
+                        help='Seed for the random number generator. Defaults to 0.')
+
+    # Parallel search against the serial search on the same time budget
+    parallel = subparsers.add_parser('parallel', help='Nodes per second and depth reached by a search player with '
+                                                      'several workers (see LazySMP), against the serial search, on '
+                                                      'the same time budget.')
+    parallel.add_argument('--game', required=True, choices=AVAILABLE_GAME_TYPES.keys(),
+                          help='Type of game to search.')
+    parallel.add_argument('--player', default='MiniMaxConnect4Player',
+                          help='The type of the player. It must accept move_time and workers. Defaults to '
+                               'MiniMaxConnect4Player.')
+    parallel.add_argument('--move-time', type=float, default=200,
+                          help='Time per move, in milliseconds. Defaults to 200.')
+    parallel.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                          help='Number of processes of the parallel search. Defaults to the number of CPUs.')
+    parallel.add_argument('--num-positions', type=int, default=20,
+                          help='Number of positions searched. Defaults to 20.')
+    parallel.add_argument('--seed', type=int, default=0,
+                          help='Seed for the random number generator. Defaults to 0.')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'throughput':
+        player_classes = [find_player_class(parser, args.game, type_name) for type_name in args.players]
+        benchmark_throughput(AVAILABLE_GAME_TYPES[args.game], player_classes, args.num_games, args.seed)
+    elif args.benchmark == 'nodes':
+        benchmark_nodes(args.game, args.depth, args.seed)
+    elif args.benchmark == 'leaves':
+        benchmark_leaves(args.num_boards, args.seed)
+    elif args.benchmark == 'parallel':
+        player_class = check_player_class(parser, find_player_class(parser, args.game, args.player),
+                                          ('move_time', 'workers'), ('get_num_nodes', 'get_depth_reached'))
+        benchmark_parallel(args.game, player_class, args.move_time, args.num_positions, args.workers, args.seed)
+    elif args.benchmark == 'search':
+        player_class = check_player_class(parser, find_player_class(parser, args.game, args.player),
+                                          ('max_depth', 'move_ordering'), ('get_num_nodes',))
+        benchmark_search(args.game, player_class, args.depth, args.num_positions, args.seed,
+                         not args.no_move_ordering)
+
+
+if __name__ == '__main__':
+    main()
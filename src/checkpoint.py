@@ -0,0 +1,56 @@
+import hashlib
+import os
+import pickle
+
+"""
+extension of the files written by the checkpoints, so clearing a folder never touches other files
+"""
+CHECKPOINT_EXTENSION = '.checkpoint'
+
+
+"""
+Builds a stable identifier for a piece of work
+:param keys: values that identify the work (their repr must be stable between runs)
+"""
+def get_work_id(*keys):
+    return hashlib.sha1(repr(keys).encode()).hexdigest()
+
+
+"""
+Builds the path of the checkpoint file for a piece of work, identified by a set of keys
+:param directory: the folder where the checkpoints are stored
+:param keys: values that identify the work (their repr must be stable between runs)
+"""
+def get_checkpoint_path(directory, *keys):
+    return os.path.join(directory, get_work_id(*keys) + CHECKPOINT_EXTENSION)
+
+
+"""
+Loads a checkpoint, returning None if it doesn't exist
+"""
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+"""
+Saves a checkpoint. The data is written to a temporary file first, so that an interruption in the middle of the
+write never leaves a corrupted checkpoint behind
+"""
+def save_checkpoint(path, data):
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        pickle.dump(data, file)
+    os.replace(temporary_path, path)
+
+
+"""
+Removes all checkpoints in a folder (creating the folder if needed)
+"""
+def clear_checkpoints(directory):
+    os.makedirs(directory, exist_ok=True)
+    for file_name in os.listdir(directory):
+        if file_name.endswith(CHECKPOINT_EXTENSION):
+            os.remove(os.path.join(directory, file_name))
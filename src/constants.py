@@ -4,13 +4,14 @@ import pkgutil
 from inspect import isclass, getfile, getmodule
 from pathlib import Path
 
-from games.connect4.simulator import Connect4Simulator
+from games.connect4.simulator import Connect4BitboardSimulator, Connect4Simulator
 from games.hlpoker.simulator import HLPokerSimulator
 from games.minesweeper.simulator import MinesweeperSimulator
 
 AVAILABLE_GAME_TYPES = {
     "hlpoker":      HLPokerSimulator,
     "connect4":     Connect4Simulator,
+    "connect4-bitboard": Connect4BitboardSimulator,
     "minesweeper":  MinesweeperSimulator,
 }
 
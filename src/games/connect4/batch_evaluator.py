@@ -0,0 +1,94 @@
+import numpy as np
+
+from games.connect4.lines import get_winning_lines
+from games.connect4.state import Connect4State
+
+
+class BatchEvaluator:
+    """
+    Scores many Connect4 boards at once with the window-based heuristic of Connect4State (score_position), for
+    searches that collect the positions of their frontier and evaluate them together.
+
+    The boards are an (N, num_rows, num_cols) int8 array with the grids (-1 for empty cells, 0 and 1 for the
+    checkers of each player). The cells of every winning line are gathered at once into an (N, lines, 4) array, the
+    checkers of each player are counted per line, and the score of each line is looked up in a table with the score
+    of every possible window.
+    """
+
+    """
+    number of boards scored at a time, so the intermediate arrays stay small for large batches
+    """
+    CHUNK_SIZE = 8192
+
+    def __init__(self, num_rows: int, num_cols: int):
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+
+        """
+        the index of each cell of each line in a flattened board
+        """
+        lines = get_winning_lines(num_rows, num_cols).get_lines()
+        self.__line_cells = np.array([[row * num_cols + col for row, col in line] for line in lines], dtype=np.intp)
+
+        """
+        the score of a window for each piece, by count of checkers of player 0 * 5 + count of checkers of player 1
+        """
+        window_scores = Connect4State(num_rows, num_cols).get_window_scores()
+        self.__window_scores = np.array(window_scores, dtype=np.int64).reshape(2, 25)
+
+    """
+    Scores a batch of boards
+    :param boards: an (N, num_rows, num_cols) array with the grids
+    :return: an (N, 2) array with the score of each board for piece 0 and for piece 1
+    """
+    def evaluate(self, boards):
+        boards = np.asarray(boards, dtype=np.int8)
+        if boards.ndim != 3 or boards.shape[1:] != (self.__num_rows, self.__num_cols):
+            raise ValueError(f"expected an array of {self.__num_rows}x{self.__num_cols} boards")
+
+        scores = np.empty((boards.shape[0], 2), dtype=np.int64)
+        for start in range(0, boards.shape[0], BatchEvaluator.CHUNK_SIZE):
+            chunk = boards[start:start + BatchEvaluator.CHUNK_SIZE]
+            scores[start:start + chunk.shape[0]] = self.__evaluate_chunk(chunk)
+        return scores
+
+    def __evaluate_chunk(self, boards):
+        cells = boards.reshape(boards.shape[0], -1)
+
+        # the number of checkers of each player in each line
+        windows = cells[:, self.__line_cells]
+        count0 = np.count_nonzero(windows == 0, axis=2)
+        count1 = np.count_nonzero(windows == 1, axis=2)
+        window_codes = count0 * 5 + count1
+
+        # Score center column
+        center_counts = [np.count_nonzero(boards[:, :, self.__num_cols // 2] == piece, axis=1) for piece in (0, 1)]
+
+        return np.stack([center_counts[piece] * 3 + self.__window_scores[piece][window_codes].sum(axis=1)
+                         for piece in (0, 1)], axis=1)
+
+
+"""
+the evaluators built so far, by board size
+"""
+__evaluators = {}
+
+
+"""
+Scores a batch of boards with the evaluator of their size (see BatchEvaluator.evaluate)
+"""
+def evaluate_boards(boards):
+    boards = np.asarray(boards, dtype=np.int8)
+    size = boards.shape[1:]
+    evaluator = __evaluators.get(size)
+    if evaluator is None:
+        evaluator = BatchEvaluator(*size)
+        __evaluators[size] = evaluator
+    return evaluator.evaluate(boards)
+
+
+"""
+Builds the array of boards of a list of states, to be scored with evaluate_boards
+"""
+def get_boards(states):
+    return np.array([state.get_grid() for state in states], dtype=np.int8)
@@ -0,0 +1,226 @@
+from games.connect4.action import Connect4Action
+from games.connect4.grid import Connect4Grid
+from games.connect4.result import Connect4Result
+from games.connect4.state import Connect4State
+from games.state import State
+from games.zobrist import get_zobrist_keys
+
+
+class Connect4BitboardState(Connect4Grid, State):
+    """
+    Connect4 state stored as bitboards, with the same contract as Connect4State.
+
+    Each player has an integer with one bit per cell. Column col takes bits col * (num_rows + 1) to
+    col * (num_rows + 1) + num_rows - 1, from the bottom to the top, plus an always empty bit on top that keeps lines
+    from wrapping into the next column. A player has four in a row when shifting its board by the distance between
+    two neighbour cells of a direction (1 vertically, num_rows + 1 horizontally, num_rows and num_rows + 2 on the
+    diagonals) and and-ing it twice leaves a bit set. Python integers have no size limit, so any board size works.
+    """
+
+    VIEW_SAFE_METHODS = Connect4State.VIEW_SAFE_METHODS
+
+    def __init__(self, num_rows: int = 6, num_cols: int = 7):
+        super().__init__()
+
+        if num_rows < 4:
+            raise Exception("the number of rows must be 4 or over")
+        if num_cols < 4:
+            raise Exception("the number of cols must be 4 or over")
+
+        """
+        the dimensions of the board and the number of bits of each column
+        """
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+        self.__column_bits = num_rows + 1
+
+        """
+        the bitboard of each player
+        """
+        self.__boards = [0, 0]
+
+        """
+        the index of the bit where the next checker of each column goes
+        """
+        self.__heights = [col * self.__column_bits for col in range(self.__num_cols)]
+
+        """
+        the grid, built from the bitboards when it is requested (None if it is outdated)
+        """
+        self.__grid = None
+
+        """
+        counts the number of turns in the current game
+        """
+        self.__turns_count = 1
+
+        """
+        the index of the current acting player
+        """
+        self.__acting_player = 0
+
+        """
+        determine if a winner was found already
+        """
+        self.__has_winner = False
+
+        """
+        the zobrist keys (the same as the ones of Connect4State, so both give the same hash) and the hash of the grid
+        and of its mirror image
+        """
+        self.__zobrist_keys = get_zobrist_keys(self.__num_rows * self.__num_cols * 2)
+        self.__hash = 0
+        self.__mirror_hash = 0
+
+    def __check_winner(self, board):
+        for shift in (1, self.__column_bits, self.__column_bits - 1, self.__column_bits + 1):
+            pairs = board & (board >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
+
+    """
+    Retrieves the grid as a list of rows (from the top one), like Connect4State does. The grid is built from the
+    bitboards, so changing it doesn't change the state
+    """
+    def get_grid(self):
+        if self.__grid is None:
+            self.__grid = [[Connect4State.EMPTY_CELL for _i in range(self.__num_cols)] for _j in range(self.__num_rows)]
+            for player, board in enumerate(self.__boards):
+                for col in range(self.__num_cols):
+                    column = board >> (col * self.__column_bits)
+                    for height in range(self.__num_rows):
+                        if column >> height & 1:
+                            self.__grid[self.__num_rows - 1 - height][col] = player
+        return self.__grid
+
+    def get_num_players(self):
+        return 2
+
+    def validate_action(self, action: Connect4Action) -> bool:
+        col = action.get_col()
+
+        # valid column
+        if col < 0 or col >= self.__num_cols:
+            return False
+
+        # full column
+        if self.__heights[col] - col * self.__column_bits >= self.__num_rows:
+            return False
+
+        return True
+
+    """
+    Checks if dropping a checker in the column of a (valid) action would connect four, without changing the state
+    :param player: the player that drops the checker (by default, the acting player)
+    """
+    def is_winning_action(self, action: Connect4Action, player: int = None) -> bool:
+        if player is None:
+            player = self.__acting_player
+        return self.__check_winner(self.__boards[player] | 1 << self.__heights[action.get_col()])
+
+    def update(self, action: Connect4Action):
+        col = action.get_col()
+
+        # drop the checker
+        height = self.__heights[col] - col * self.__column_bits
+        self.__boards[self.__acting_player] |= 1 << self.__heights[col]
+        self.__heights[col] += 1
+        self.__grid = None
+        self.__hash ^= self.__zobrist_keys[
+            ((self.__num_rows - 1 - height) * self.__num_cols + col) * 2 + self.__acting_player]
+        self.__mirror_hash ^= self.__zobrist_keys[
+            ((self.__num_rows - height) * self.__num_cols - 1 - col) * 2 + self.__acting_player]
+
+        # determine if there is a winner
+        self.__has_winner = self.__check_winner(self.__boards[self.__acting_player])
+
+        # switch to next player
+        self.__acting_player = 1 if self.__acting_player == 0 else 0
+
+        self.__turns_count += 1
+
+    def undo(self, action: Connect4Action):
+        col = action.get_col()
+
+        # switch to the previous player, who dropped the top checker of the column
+        self.__acting_player = 1 if self.__acting_player == 0 else 0
+
+        # remove the top checker of the column
+        self.__heights[col] -= 1
+        height = self.__heights[col] - col * self.__column_bits
+        self.__boards[self.__acting_player] ^= 1 << self.__heights[col]
+        self.__grid = None
+        self.__hash ^= self.__zobrist_keys[
+            ((self.__num_rows - 1 - height) * self.__num_cols + col) * 2 + self.__acting_player]
+        self.__mirror_hash ^= self.__zobrist_keys[
+            ((self.__num_rows - height) * self.__num_cols - 1 - col) * 2 + self.__acting_player]
+
+        # the game only goes on while there is no winner
+        self.__has_winner = False
+
+        self.__turns_count -= 1
+
+    def __is_full(self):
+        return self.__turns_count > (self.__num_cols * self.__num_rows)
+
+    def is_finished(self) -> bool:
+        return self.__has_winner or self.__is_full()
+
+    def get_acting_player(self) -> int:
+        return self.__acting_player
+
+    def clone(self):
+        cloned_state = Connect4BitboardState(self.__num_rows, self.__num_cols)
+        cloned_state.__boards = self.__boards.copy()
+        cloned_state.__heights = self.__heights.copy()
+        cloned_state.__turns_count = self.__turns_count
+        cloned_state.__acting_player = self.__acting_player
+        cloned_state.__has_winner = self.__has_winner
+        cloned_state.__hash = self.__hash
+        cloned_state.__mirror_hash = self.__mirror_hash
+        return cloned_state
+
+    def get_result(self, pos):
+        if self.__has_winner:
+            return Connect4Result.LOOSE.value if pos == self.__acting_player else Connect4Result.WIN.value
+        if self.__is_full():
+            return Connect4Result.DRAW.value
+        return None
+
+    def get_hash(self) -> int:
+        return self.__hash
+
+    """
+    Retrieves the hash of the position or the hash of its mirror image (across the center column), whichever is lower,
+    so both mirrors share it. Caches keyed on it keep one entry per pair of mirrors, so what they store must be the
+    same for both (e.g. scores of a symmetric evaluation, or of the board of the canonical one): actions stored with it
+    are in the columns of the lower one, and is_mirrored tells if they have to be mapped with get_mirror_col
+    """
+    def get_canonical_hash(self) -> int:
+        return min(self.__hash, self.__mirror_hash)
+
+    """
+    Checks if the canonical hash is the one of the mirror image of the position
+    """
+    def is_mirrored(self) -> bool:
+        return self.__mirror_hash < self.__hash
+
+    """
+    Retrieves the column that matches a column in the mirror image of the board
+    """
+    def get_mirror_col(self, col: int) -> int:
+        return self.__num_cols - 1 - col
+
+    def get_num_rows(self):
+        return self.__num_rows
+
+    def get_num_cols(self):
+        return self.__num_cols
+
+    def before_results(self):
+        pass
+
+    def get_possible_actions(self):
+        return [Connect4Action(col) for col in range(0, self.__num_cols) if
+                self.__heights[col] - col * self.__column_bits < self.__num_rows]
@@ -0,0 +1,104 @@
+from termcolor import colored
+
+from games.connect4.lines import get_winning_lines
+
+
+class Connect4Grid:
+    """
+    Display and scoring of a Connect4 board, shared by the states that store it in different ways (Connect4State and
+    Connect4BitboardState). They only need to provide get_grid (a list of rows, from the top one), get_num_rows and
+    get_num_cols.
+    """
+
+    EMPTY_CELL = -1
+
+    def __display_cell(self, row, col):
+        cell_value = self.get_grid()[row][col]
+        if cell_value == 0:
+            # Player 1 - Red
+            print(colored('●', 'red'), end="")
+        elif cell_value == 1:
+            # Player 2 - Blue
+            print(colored('○', 'blue'), end="")
+        else:
+            # Empty cell
+            print(' ', end="")
+
+    def __display_numbers(self):
+        for col in range(0, self.get_num_cols()):
+            if col < 10:
+                print(' ', end="")
+            print(col, end="")
+        print("")
+
+    def __display_separator(self):
+        for col in range(0, self.get_num_cols()):
+            print("--", end="")
+        print("-")
+
+    def display(self):
+        self.__display_numbers()
+        self.__display_separator()
+
+        for row in range(0, self.get_num_rows()):
+            print('|', end="")
+            for col in range(0, self.get_num_cols()):
+                self.__display_cell(row, col)
+                print('|', end="")
+            print("")
+            self.__display_separator()
+
+        self.__display_numbers()
+        print("")
+
+    def score_position(self, grid, piece):
+        score = 0
+        num_rows, num_cols = len(grid), len(grid[0])
+
+        # Score center column
+        center_count = [grid[row][num_cols // 2] for row in range(num_rows)].count(piece)
+        score += center_count * 3
+
+        # Score every window (horizontal, vertical and both diagonals)
+        for window in get_winning_lines(num_rows, num_cols).get_windows(grid):
+            score += self.evaluate_window(window, piece)
+
+        return score
+
+    """
+    Computes score_position(get_grid(), piece) (states that can keep it up to date as checkers are added override
+    this)
+    :param piece: the player (0 or 1) the position is scored for
+    """
+    def heuristic(self, piece):
+        return self.score_position(self.get_grid(), piece)
+
+    """
+    Scores every possible window, given by its number of checkers of each player, with evaluate_window
+    :return: the score of the window for each piece (0 and 1), indexed as [piece][count of 0][count of 1] (the
+    counts of impossible windows, over 4 checkers, score 0)
+    """
+    def get_window_scores(self):
+        scores = [[[0] * 5 for _i in range(5)] for _piece in (0, 1)]
+        for count0 in range(0, 5):
+            for count1 in range(0, 5 - count0):
+                window = [0] * count0 + [1] * count1 + [Connect4Grid.EMPTY_CELL] * (4 - count0 - count1)
+                for piece in (0, 1):
+                    scores[piece][count0][count1] = self.evaluate_window(window, piece)
+        return scores
+
+    def evaluate_window(self, window, piece):
+        score = 0
+        opponent_piece = 1 if piece == 2 else 2
+
+        if window.count(piece) == 4:
+            score += 100
+        elif window.count(piece) == 3 and window.count(0) == 1:
+            score += 5
+        elif window.count(piece) == 2 and window.count(0) == 2:
+            score += 2
+
+        if window.count(opponent_piece) == 3 and window.count(0) == 1:
+            score -= 4
+
+        return score
@@ -0,0 +1,90 @@
+from operator import itemgetter
+
+
+class WinningLines:
+    """
+    Table with every line of four cells of a board (the windows where a player can connect four), and the lines that
+    pass through each cell. Tables are built once per board size with get_winning_lines and shared by all states
+    and players.
+
+    The cells of each line are ordered from its first cell: left to right for rows, top to bottom for columns, and
+    top to bottom for both diagonals (to the right and to the left).
+    """
+
+    """
+    the direction of each kind of line (row step, col step)
+    """
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, num_rows: int, num_cols: int):
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+
+        """
+        the cells (row, col) of each line
+        """
+        self.__lines = []
+        for row_step, col_step in WinningLines.DIRECTIONS:
+            for row in range(num_rows):
+                for col in range(num_cols):
+                    last_row, last_col = row + 3 * row_step, col + 3 * col_step
+                    if 0 <= last_row < num_rows and 0 <= last_col < num_cols:
+                        self.__lines.append(tuple((row + i * row_step, col + i * col_step) for i in range(4)))
+
+        """
+        the lines through each cell, and their indexes in the list of lines
+        """
+        self.__lines_through = [[[] for _col in range(num_cols)] for _row in range(num_rows)]
+        self.__line_indexes_through = [[[] for _col in range(num_cols)] for _row in range(num_rows)]
+        for index, line in enumerate(self.__lines):
+            for row, col in line:
+                self.__lines_through[row][col].append(line)
+                self.__line_indexes_through[row][col].append(index)
+
+        """
+        for each line, a getter of its values from the cells of the grid in a flat list (row by row)
+        """
+        self.__getters = [itemgetter(*[row * num_cols + col for row, col in line]) for line in self.__lines]
+
+    def get_num_rows(self):
+        return self.__num_rows
+
+    def get_num_cols(self):
+        return self.__num_cols
+
+    def get_lines(self):
+        return self.__lines
+
+    def get_num_lines(self):
+        return len(self.__lines)
+
+    def get_lines_through(self, row, col):
+        return self.__lines_through[row][col]
+
+    def get_line_indexes_through(self, row, col):
+        return self.__line_indexes_through[row][col]
+
+    """
+    Retrieves the values of the cells of each line of a grid, as a tuple per line (in the order of get_lines)
+    :param grid: a list of rows (or anything indexed as grid[row][col])
+    """
+    def get_windows(self, grid):
+        cells = [value for row in grid for value in row]
+        return [getter(cells) for getter in self.__getters]
+
+
+"""
+the tables built so far, by board size
+"""
+__tables = {}
+
+
+"""
+Retrieves the table with the winning lines of a board size (built the first time it is requested)
+"""
+def get_winning_lines(num_rows: int, num_cols: int) -> WinningLines:
+    table = __tables.get((num_rows, num_cols))
+    if table is None:
+        table = WinningLines(num_rows, num_cols)
+        __tables[(num_rows, num_cols)] = table
+    return table
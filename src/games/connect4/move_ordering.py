@@ -0,0 +1,111 @@
+class MoveOrdering:
+    """
+    Orders the actions of the nodes of an alpha-beta search on Connect4, so the best ones are searched first and
+    the rest are cut off sooner. The actions are ranked by:
+        - immediate wins of the acting player
+        - forced blocks (the opponent would win by dropping a checker in the same column)
+        - the move of the principal variation found by the previous iteration of iterative deepening
+        - the killer moves of the ply (the last moves that caused a cutoff at the same depth of the tree)
+        - the history counters (how much each column caused cutoffs so far, for each player)
+        - the distance to the center column
+    None of this needs copies of the state: wins and blocks are checked with Connect4State.is_winning_action.
+    """
+
+    """
+    number of killer moves kept per ply
+    """
+    NUM_KILLERS = 2
+
+    """
+    rank of each kind of action (higher ranks are searched first)
+    """
+    WIN_RANK = 5
+    BLOCK_RANK = 4
+    PV_RANK = 3
+    KILLER_RANK = 2
+    OTHER_RANK = 0
+
+    def __init__(self, num_cols: int):
+        self.__num_cols = num_cols
+
+        """
+        the killer moves of each ply, the most recent first
+        """
+        self.__killers = []
+
+        """
+        the history counter of each column, for each player
+        """
+        self.__history = [[0] * num_cols for _player in (0, 1)]
+
+        """
+        the column of the principal variation at each of its positions (by position hash)
+        """
+        self.__principal_variation = {}
+
+    """
+    Prepares the ordering for the search of a new move: the killer moves are forgotten (they belong to the plies of
+    the previous search) and the history counters are halved, so recent cutoffs weigh more
+    """
+    def new_search(self):
+        self.__killers = []
+        self.__principal_variation = {}
+        for counters in self.__history:
+            for col in range(self.__num_cols):
+                counters[col] //= 2
+
+    """
+    Sets the principal variation found by an iteration, which the next iteration searches first
+    :param principal_variation: a list with the hash of each position of the variation and the column played there
+    """
+    def set_principal_variation(self, principal_variation):
+        self.__principal_variation = dict(principal_variation)
+
+    """
+    Sorts the actions of a node
+    :param state: the state of the node
+    :param actions: the possible actions of the state
+    :param ply: the distance from the root of the search
+    :return: the sorted list of actions
+    """
+    def order(self, state, actions, ply: int):
+        player = state.get_acting_player()
+        opponent = 1 - player
+        pv_col = self.__principal_variation.get(state.get_hash())
+        killers = self.__killers[ply] if ply < len(self.__killers) else ()
+        history = self.__history[player]
+        center_col = self.__num_cols // 2
+
+        def action_key(action):
+            col = action.get_col()
+            if state.is_winning_action(action, player):
+                rank = MoveOrdering.WIN_RANK
+            elif state.is_winning_action(action, opponent):
+                rank = MoveOrdering.BLOCK_RANK
+            elif col == pv_col:
+                rank = MoveOrdering.PV_RANK
+            elif col in killers:
+                rank = MoveOrdering.KILLER_RANK - killers.index(col) / MoveOrdering.NUM_KILLERS
+            else:
+                rank = MoveOrdering.OTHER_RANK
+            return -rank, -history[col], abs(col - center_col)
+
+        return sorted(actions, key=action_key)
+
+    """
+    Records that an action caused a cutoff
+    :param player: the player of the action
+    :param col: the column of the action
+    :param ply: the distance from the root of the search
+    :param depth: the depth left to search below the node (deeper cutoffs weigh more)
+    """
+    def add_cutoff(self, player: int, col: int, ply: int, depth: int):
+        while len(self.__killers) <= ply:
+            self.__killers.append([])
+        killers = self.__killers[ply]
+        if col in killers:
+            killers.remove(col)
+        killers.insert(0, col)
+        del killers[MoveOrdering.NUM_KILLERS:]
+
+        self.__history[player][col] += depth * depth
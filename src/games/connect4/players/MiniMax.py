@@ -1,111 +1,265 @@
 import math
+import os
 import random
+import time
 from games.connect4.result import Connect4Result
 from games.connect4.action import Connect4Action
+from games.connect4.lines import get_winning_lines
+from games.connect4.move_ordering import MoveOrdering
 from games.connect4.player import Connect4Player
 from games.connect4.state import Connect4State
+from games.lazy_smp import LazySMP
 from games.state import State
+from games.time_control import SearchTimeout
+from games.transposition_table import TranspositionTable
 
 
 class MiniMaxConnect4Player(Connect4Player):
 
-    def __init__(self, name, max_depth=4):
+    """
+    default size of the transposition table, in bytes
+    """
+    TT_MEMORY = 4 * 1024 * 1024
+
+    """
+    values are seen from the position of the player, so the position is mixed into the key of the table
+    """
+    PERSPECTIVE_KEYS = (0, 0x9E3779B97F4A7C15)
+
+    def __init__(self, name, max_depth=4, tt_memory=TT_MEMORY, move_ordering=True, move_time=None, workers=1,
+                 tt_buffer=None):
         super().__init__(name)
-        self.memo = {}
+        self.memo = TranspositionTable(tt_memory, tt_buffer)
         self.max_depth = max_depth
+        self.tt_memory = tt_memory
+
+        # time for each move, in milliseconds, when the simulator doesn't give a budget. With a budget, the search
+        # deepens until it runs out (max_depth is ignored) and the best action of the last complete depth is played
+        self.move_time = move_time
+
+        # time at which the running search is abandoned (None if it has no time limit), and the depth of the last
+        # complete iteration of the last search
+        self.deadline = None
+        self.depth_reached = 0
+
+        # orders the actions of each node (built for the board of the first search). If move_ordering is False,
+        # actions are only sorted by their distance to the center
+        self.use_move_ordering = move_ordering
+        self.ordering = None
+
+        # number of nodes searched so far (by the player and by its helpers)
+        self.nodes = 0
+        self.helper_nodes = 0
+
+        # number of processes that search each move (see LazySMP). The helpers are started on the first search
+        self.workers = workers
+        self.smp = None
 
-    def minimax(self, state: Connect4State, depth, alpha, beta, maximizingPlayer):
+        # set in the copies of the player that help another one search: their index (0 for the player itself) and
+        # the flag that tells them to stop
+        self.helper_index = 0
+        self.stop_flag = None
+
+    def get_num_nodes(self):
+        return self.nodes + self.helper_nodes
+
+    def get_depth_reached(self):
+        return self.depth_reached
+
+    """
+    Makes the player a helper of a parallel search: it searches until the stop flag is set, from depth 2 if its index
+    is odd, and starting each iteration with the action of that index (in the order of the others)
+    """
+    def set_helper(self, index, stop_flag):
+        self.helper_index = index
+        self.stop_flag = stop_flag
+
+    def minimax(self, state: Connect4State, depth, alpha, beta, maximizingPlayer, ply=0):
+        self.nodes += 1
+        if self.deadline is not None and \
+                (time.perf_counter() >= self.deadline or self.stop_flag is not None and self.stop_flag.value):
+            raise SearchTimeout()
         pos = self.get_current_pos()
         current_player = state.get_acting_player()
 
-        # Check if the result is in memo
-        state_key = (str(state.get_grid()), depth, alpha, beta, maximizingPlayer)
-        if state_key in self.memo:
-            return self.memo[state_key]
+        # Check if the position (or its mirror image) was searched already, deep enough to use its value or at least
+        # its bounds. Mirrors share an entry, whose action is in the columns of the one with the canonical hash (this
+        # needs mirrors to get the same value, see the leaves below)
+        state_key = state.get_canonical_hash() ^ MiniMaxConnect4Player.PERSPECTIVE_KEYS[pos]
+        mirrored = state.is_mirrored()
+        original_alpha, original_beta = alpha, beta
+        entry = self.memo.probe(state_key)
+        if entry is not None:
+            tt_value, tt_depth, tt_flag, tt_col = entry
+            if tt_depth >= depth and tt_col != TranspositionTable.NO_ACTION:
+                if mirrored:
+                    tt_col = state.get_mirror_col(tt_col)
+                if tt_flag == TranspositionTable.EXACT:
+                    return tt_col, tt_value
+                if tt_flag == TranspositionTable.LOWER_BOUND:
+                    alpha = max(alpha, tt_value)
+                elif tt_flag == TranspositionTable.UPPER_BOUND:
+                    beta = min(beta, tt_value)
+                if alpha >= beta:
+                    return tt_col, tt_value
 
         if depth == 0 or state.is_finished():
             result = state.get_result(pos)
             if result is not None:
-                if result == Connect4Result.WIN:
+                if result == Connect4Result.WIN.value:
                     return None, float('inf')
-                elif result == Connect4Result.LOOSE:
+                elif result == Connect4Result.LOOSE.value:
                     return None, float('-inf')
                 else:  # Draw
                     return None, 0
             else:
-                return None, self.score_position(state.get_grid(), current_player)
+                # score_position isn't symmetric (it only counts windows by their first cell), so the board of the
+                # canonical mirror is scored: both mirrors get the same value, like they get the same entry
+                grid = state.get_grid()
+                if mirrored:
+                    grid = [row[::-1] for row in grid]
+                return None, self.score_position(grid, current_player)
 
         possible_actions = state.get_possible_actions()
-        center_col = state.get_num_cols() // 2
-
-        def action_score(action):
-            col = action.get_col()
-            next_state = state.clone()
-            next_state.update(action)
-            if next_state.get_result(pos) == Connect4Result.WIN:
-                return float('inf') if maximizingPlayer else float('-inf')
-            return abs(col - center_col)
-
-        possible_actions.sort(key=action_score, reverse=maximizingPlayer)
+        if self.ordering is not None:
+            possible_actions = self.ordering.order(state, possible_actions, ply)
+        else:
+            center_col = state.get_num_cols() // 2
+            possible_actions.sort(key=lambda action: abs(action.get_col() - center_col), reverse=maximizingPlayer)
+        if ply == 0 and self.helper_index > 0:
+            first = self.helper_index % len(possible_actions)
+            possible_actions = possible_actions[first:] + possible_actions[:first]
 
         if maximizingPlayer:
             value = -math.inf
             best_action = random.choice(possible_actions)
             for action in possible_actions:
-                next_state = state.clone()
-                next_state.update(action)
-                new_score = self.minimax(next_state, depth - 1, alpha, beta, False)[1]
+                state.push(action)
+                new_score = self.minimax(state, depth - 1, alpha, beta, False, ply + 1)[1]
+                state.pop()
                 if new_score > value:
                     value = new_score
                     best_action = action
                 alpha = max(alpha, value)
                 if alpha >= beta:
+                    if self.ordering is not None:
+                        self.ordering.add_cutoff(current_player, action.get_col(), ply, depth)
                     break
             result = best_action.get_col(), value
         else:
             value = math.inf
             best_action = random.choice(possible_actions)
             for action in possible_actions:
-                next_state = state.clone()
-                next_state.update(action)
-                new_score = self.minimax(next_state, depth - 1, alpha, beta, True)[1]
+                state.push(action)
+                new_score = self.minimax(state, depth - 1, alpha, beta, True, ply + 1)[1]
+                state.pop()
                 if new_score < value:
                     value = new_score
                     best_action = action
                 beta = min(beta, value)
                 if alpha >= beta:
+                    if self.ordering is not None:
+                        self.ordering.add_cutoff(current_player, action.get_col(), ply, depth)
                     break
             result = best_action.get_col(), value
 
-        self.memo[state_key] = result
+        if value <= original_alpha:
+            flag = TranspositionTable.UPPER_BOUND
+        elif value >= original_beta:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        self.memo.store(state_key, value, depth, flag, state.get_mirror_col(result[0]) if mirrored else result[0])
         return result
 
     def get_action(self, state: Connect4State):
-        if self.max_depth is None:
-            max_depth = self.max_depth
+        budget = self.get_time_budget()
+        if budget is None:
+            budget = self.move_time
+        start = time.perf_counter()
 
-        possible_actions = state.get_possible_actions()
-        center_col = state.get_num_cols() // 2
+        # the search walks the tree in place (with push and pop) on a private copy of the state
+        state = state.clone()
 
-        def action_score(action):
-            col = action.get_col()
-            next_state = state.clone()
-            next_state.update(action)
-            if next_state.get_result(self.get_current_pos()) == Connect4Result.WIN:
-                return float('inf')
-            return abs(col - center_col)
+        # with a time budget, searching past the number of empty cells would only repeat the last iteration
+        max_depth = self.max_depth
+        if budget is not None:
+            max_depth = sum(row.count(Connect4State.EMPTY_CELL) for row in state.get_grid())
 
-        possible_actions.sort(key=action_score, reverse=True)
+        if self.use_move_ordering:
+            if self.ordering is None:
+                self.ordering = MoveOrdering(state.get_num_cols())
+            self.ordering.new_search()
+
+        # the helpers search the same position until this search ends
+        smp = self.get_lazy_smp()
+        if smp is not None:
+            smp.start_search(state, self.get_current_pos(), budget)
 
         best_action = None
-        for depth in range(1, self.max_depth + 1):  # max_depth é a profundidade máxima desejada
-            column, _ = self.minimax(state, depth=depth, alpha=-math.inf, beta=math.inf, maximizingPlayer=True)
+        self.deadline = math.inf if self.helper_index > 0 else None
+        self.depth_reached = 0
+        for depth in range(1 + self.helper_index % 2, max_depth + 1):  # max_depth é a profundidade máxima desejada
+            try:
+                column, value = self.minimax(state, depth=depth, alpha=-math.inf, beta=math.inf,
+                                             maximizingPlayer=True)
+            except SearchTimeout:
+                # the iteration was abandoned, so the action of the previous one is kept
+                break
+            finally:
+                # the first iteration always completes, so there is an action to play (helpers only stop when
+                # they are told to)
+                if budget is not None and self.helper_index == 0:
+                    self.deadline = start + budget / 1000
             if column is not None:
                 best_action = Connect4Action(column)
+                self.depth_reached = depth
+                if self.ordering is not None:
+                    self.ordering.set_principal_variation(self.get_principal_variation(state, depth))
             else:
                 break  # Se não houver ação válida para a profundidade atual, pare a iteração
+            # a forced win or loss won't change with a deeper search
+            if budget is not None and math.isinf(value):
+                break
+        self.deadline = None
+
+        if smp is not None:
+            _depths, nodes = smp.stop_search()
+            self.helper_nodes += nodes
         return best_action
 
+    """
+    Retrieves the helpers of the parallel search, starting them the first time (None if the player searches alone,
+    which it also does when parallel searches are disabled in its process, see LazySMP.set_enabled)
+    """
+    def get_lazy_smp(self):
+        if self.smp is None and self.workers > 1 and self.helper_index == 0 and LazySMP.is_enabled():
+            self.smp = LazySMP(MiniMaxConnect4Player, self.workers - 1, self.tt_memory, max_depth=self.max_depth,
+                               move_ordering=self.use_move_ordering)
+            # the player moves to the shared table (the results in its own table are dropped)
+            self.memo = self.smp.get_table()
+        return self.smp
+
+    """
+    follows the best actions stored in the transposition table from a state
+    :return: a list with the hash of each position of the variation and the column played there
+    """
+    def get_principal_variation(self, state: Connect4State, depth):
+        variation = []
+        perspective_key = MiniMaxConnect4Player.PERSPECTIVE_KEYS[self.get_current_pos()]
+        while len(variation) < depth and not state.is_finished():
+            entry = self.memo.probe(state.get_canonical_hash() ^ perspective_key)
+            if entry is None or not 0 <= entry[3] < state.get_num_cols():
+                break
+            col = state.get_mirror_col(entry[3]) if state.is_mirrored() else entry[3]
+            if not state.validate_action(Connect4Action(col)):
+                break
+            variation.append((state.get_hash(), col))
+            state.push(Connect4Action(col))
+        for _ in variation:
+            state.pop()
+        return variation
+
     def event_action(self, pos: int, action, new_state: State):
         pass
 
@@ -123,78 +277,23 @@ class MiniMaxConnect4Player(Connect4Player):
         center_count = center_array.count(piece)
         score += center_count * 3
 
+        # the windows of the board, each one starting at its first cell (see WinningLines)
+        windows = get_winning_lines(len(grid), len(grid[0])).get_windows(grid)
+
         # Padrões de Bloqueio
-        for r in range(len(grid)):
-            for c in range(len(grid[0])):
-                if grid[r][c] == opponent_piece:
-                    # Horizontal
-                    if c <= len(grid[0]) - 4:
-                        window = grid[r][c:c + 4]
-                        if window.count(opponent_piece) == 3 and window.count(0) == 1:
-                            score -= 10
-                    # Vertical
-                    if r <= len(grid) - 4:
-                        window = [grid[i][c] for i in range(r, r + 4)]
-                        if window.count(opponent_piece) == 3 and window.count(0) == 1:
-                            score -= 10
-                    # Diagonal (positiva)
-                    if c <= len(grid[0]) - 4 and r <= len(grid) - 4:
-                        window = [grid[r + i][c + i] for i in range(4)]
-                        if window.count(opponent_piece) == 3 and window.count(0) == 1:
-                            score -= 10
-                    # Diagonal (negativa)
-                    if c >= 3 and r <= len(grid) - 4:
-                        window = [grid[r + i][c - i] for i in range(4)]
-                        if window.count(opponent_piece) == 3 and window.count(0) == 1:
-                            score -= 10
+        for window in windows:
+            if window[0] == opponent_piece and window.count(opponent_piece) == 3 and window.count(0) == 1:
+                score -= 10
 
         # Padrões de Ataque
-        for r in range(len(grid)):
-            for c in range(len(grid[0])):
-                if grid[r][c] == piece:
-                    # Horizontal
-                    if c <= len(grid[0]) - 4:
-                        window = grid[r][c:c + 4]
-                        score += MiniMaxConnect4Player.evaluate_window(window, piece, opponent_piece)
-                    # Vertical
-                    if r <= len(grid) - 4:
-                        window = [grid[i][c] for i in range(r, r + 4)]
-                        score += MiniMaxConnect4Player.evaluate_window(window, piece, opponent_piece)
-                    # Diagonal (positiva)
-                    if c <= len(grid[0]) - 4 and r <= len(grid) - 4:
-                        window = [grid[r + i][c + i] for i in range(4)]
-                        score += MiniMaxConnect4Player.evaluate_window(window, piece, opponent_piece)
-                    # Diagonal (negativa)
-                    if c >= 3 and r <= len(grid) - 4:
-                        window = [grid[r + i][c - i] for i in range(4)]
-                        score += MiniMaxConnect4Player.evaluate_window(window, piece, opponent_piece)
-
-            # Padrões específicos
-            for r in range(len(grid)):
-                for c in range(len(grid[0])):
-                    if grid[r][c] == piece:
-                        # Verificar padrões horizontais
-                        if c <= len(grid[0]) - 4:
-                            window = grid[r][c:c + 4]
-                            if window.count(piece) == 3 and window.count(0) == 1:
-                                score += 10  # Peso extra para padrão de 3 peças com espaço vazio ao lado
-                        # Verificar padrões verticais
-                        if r <= len(grid) - 4:
-                            window = [grid[i][c] for i in range(r, r + 4)]
-                            if window.count(piece) == 3 and window.count(0) == 1:
-                                score += 10  # Peso extra para padrão de 3 peças com espaço vazio abaixo
-                        # Verificar padrões diagonais (positivas)
-                        if c <= len(grid[0]) - 4 and r <= len(grid) - 4:
-                            window = [grid[r + i][c + i] for i in range(4)]
-                            if window.count(piece) == 3 and window.count(0) == 1:
-                                score += 10  # Peso extra para padrão de 3 peças com espaço vazio na diagonal (positiva)
-                        # Verificar padrões diagonais (negativas)
-                        if c >= 3 and r <= len(grid) - 4:
-                            window = [grid[r + i][c - i] for i in range(4)]
-                            if window.count(piece) == 3 and window.count(0) == 1:
-                                score += 10  # Peso extra para padrão de 3 peças com espaço vazio na diagonal (negativa)
-
+        for window in windows:
+            if window[0] == piece:
+                score += MiniMaxConnect4Player.evaluate_window(window, piece, opponent_piece)
 
+        # Padrões específicos (counted once per row)
+        for window in windows:
+            if window[0] == piece and window.count(piece) == 3 and window.count(0) == 1:
+                score += 10 * len(grid)  # Peso extra para padrão de 3 peças com espaço vazio
 
         return score
 
@@ -215,3 +314,14 @@ class MiniMaxConnect4Player(Connect4Player):
             score -= 4
 
         return score
+
+
+class ParallelMiniMaxConnect4Player(MiniMaxConnect4Player):
+    """
+    MiniMaxConnect4Player that searches each move with one process per CPU (see LazySMP). It is meant to be played
+    with a time limit (--move-time or --game-time), and it searches alone when the matches are played by several
+    workers
+    """
+
+    def __init__(self, name, workers=None, **kwargs):
+        super().__init__(name, workers=workers if workers is not None else os.cpu_count() or 1, **kwargs)
@@ -3,6 +3,7 @@ import random
 from random import choice
 from games.connect4.result import Connect4Result
 from games.connect4.action import Connect4Action
+from games.connect4.lines import get_winning_lines
 from games.connect4.player import Connect4Player
 from games.connect4.state import Connect4State
 from games.state import State
@@ -19,7 +20,7 @@ class MiniConnect4Player(Connect4Player):
         current_player = state.get_acting_player()
 
         # Check if the result is in memo
-        state_key = str(state.get_grid()) + str(depth) + str(alpha) + str(beta) + str(maximizingPlayer)
+        state_key = (state.get_hash(), depth, alpha, beta, maximizingPlayer)
         if state_key in self.memo:
             return self.memo[state_key]
 
@@ -46,9 +47,9 @@ class MiniConnect4Player(Connect4Player):
             value = -math.inf
             column = random.choice(range(state.get_num_cols()))
             for action in possible_actions:
-                next_state = state.clone()
-                next_state.update(action)
-                new_score = self.minimax(next_state, depth - 1, alpha, beta, False)[1]
+                state.push(action)
+                new_score = self.minimax(state, depth - 1, alpha, beta, False)[1]
+                state.pop()
                 if new_score > value:
                     value = new_score
                     column = action.get_col()
@@ -60,9 +61,9 @@ class MiniConnect4Player(Connect4Player):
             value = math.inf
             column = random.choice(range(state.get_num_cols()))
             for action in possible_actions:
-                next_state = state.clone()
-                next_state.update(action)
-                new_score = self.minimax(next_state, depth - 1, alpha, beta, True)[1]
+                state.push(action)
+                new_score = self.minimax(state, depth - 1, alpha, beta, True)[1]
+                state.pop()
                 if new_score < value:
                     value = new_score
                     column = action.get_col()
@@ -77,6 +78,9 @@ class MiniConnect4Player(Connect4Player):
         return result
 
     def get_action(self, state: Connect4State):
+        # the search walks the tree in place (with push and pop) on a private copy of the state
+        state = state.clone()
+
         # Order moves: prioritize the center columns
         possible_actions = sorted(state.get_possible_actions(),
                                   key=lambda action: abs(action.get_col() - state.get_num_cols() // 2))
@@ -102,31 +106,9 @@ class MiniConnect4Player(Connect4Player):
         center_count = center_array.count(piece)
         score += center_count * 3
 
-        # Score Horizontal
-        for r in range(len(grid)):
-            row_array = [int(i) for i in grid[r]]
-            for c in range(len(grid[0]) - 3):
-                window = row_array[c:c + 4]
-                score += MiniConnect4Player.evaluate_window(window, piece)
-
-        # Score Vertical
-        for c in range(len(grid[0])):
-            col_array = [int(row[c]) for row in grid]
-            for r in range(len(grid) - 3):
-                window = col_array[r:r + 4]
-                score += MiniConnect4Player.evaluate_window(window, piece)
-
-        # Score positive sloped diagonal
-        for r in range(len(grid) - 3):
-            for c in range(len(grid[0]) - 3):
-                window = [grid[r + i][c + i] for i in range(4)]
-                score += MiniConnect4Player.evaluate_window(window, piece)
-
-        # Score negatively sloped diagonal
-        for r in range(len(grid) - 3):
-            for c in range(len(grid[0]) - 3):
-                window = [grid[r + 3 - i][c + i] for i in range(4)]
-                score += MiniConnect4Player.evaluate_window(window, piece)
+        # Score every window (horizontal, vertical and both diagonals)
+        for window in get_winning_lines(len(grid), len(grid[0])).get_windows(grid):
+            score += MiniConnect4Player.evaluate_window(window, piece)
 
         return score
 
@@ -1,4 +1,5 @@
 from games.connect4.action import Connect4Action
+from games.connect4.bitboard_state import Connect4BitboardState
 from games.connect4.player import Connect4Player
 from games.connect4.state import Connect4State
 from games.game_simulator import GameSimulator
@@ -15,7 +16,7 @@ class Connect4Simulator(GameSimulator):
         self.__num_cols = num_cols
 
     def on_init_game(self):
-        return Connect4State(self.__num_rows, self.__num_cols)
+        return self.get_state_type()(self.__num_rows, self.__num_cols)
 
     def on_before_end_game(self, state: Connect4State):
         # ignored for this simulator
@@ -39,4 +40,14 @@ class Connect4Simulator(GameSimulator):
 
     @staticmethod
     def get_action_type():
-        return Connect4Action
\ No newline at end of file
+        return Connect4Action
+
+
+class Connect4BitboardSimulator(Connect4Simulator):
+    """
+    Connect4 simulator whose states are stored as bitboards (see Connect4BitboardState)
+    """
+
+    @staticmethod
+    def get_state_type():
+        return Connect4BitboardState
@@ -1,14 +1,24 @@
 from typing import Optional
 
-from termcolor import colored
-import numpy as np
 from games.connect4.action import Connect4Action
+from games.connect4.grid import Connect4Grid
+from games.connect4.lines import get_winning_lines
 from games.connect4.result import Connect4Result
 from games.state import State
+from games.zobrist import get_zobrist_keys
 
 
-class Connect4State(State):
-    EMPTY_CELL = -1
+class Connect4State(Connect4Grid, State):
+
+    """
+    the change of the score of the lines for each piece (0 and 1) when a checker is added to a line, by player of
+    the checker and number of checkers of each player in the line (built the first time a heuristic is computed)
+    """
+    __heuristic_deltas = None
+
+    VIEW_SAFE_METHODS = State.VIEW_SAFE_METHODS | {'get_num_rows', 'get_num_cols', 'get_possible_actions',
+                                                    'is_winning_action', 'get_canonical_hash', 'is_mirrored',
+                                                    'get_mirror_col'}
 
     def __init__(self, num_rows: int = 6, num_cols: int = 7):
         super().__init__()
@@ -29,6 +39,16 @@ class Connect4State(State):
         """
         self.__grid = [[Connect4State.EMPTY_CELL for _i in range(self.__num_cols)] for _j in range(self.__num_rows)]
 
+        """
+        the number of checkers in each column (the next checker of a column lands at row num_rows - 1 - height)
+        """
+        self.__heights = [0] * self.__num_cols
+
+        """
+        the winning lines of the board (shared by all states with the same dimensions)
+        """
+        self.__lines = get_winning_lines(self.__num_rows, self.__num_cols)
+
         """
         counts the number of turns in the current game
         """
@@ -44,43 +64,32 @@ class Connect4State(State):
         """
         self.__has_winner = False
 
-    def __check_winner(self, player):
-        # check for 4 across
-        for row in range(0, self.__num_rows):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row][col + 1] == player and \
-                        self.__grid[row][col + 2] == player and \
-                        self.__grid[row][col + 3] == player:
-                    return True
-
-        # check for 4 up and down
-        for row in range(0, self.__num_rows - 3):
-            for col in range(0, self.__num_cols):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row + 1][col] == player and \
-                        self.__grid[row + 2][col] == player and \
-                        self.__grid[row + 3][col] == player:
-                    return True
-
-        # check upward diagonal
-        for row in range(3, self.__num_rows):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row - 1][col + 1] == player and \
-                        self.__grid[row - 2][col + 2] == player and \
-                        self.__grid[row - 3][col + 3] == player:
-                    return True
-
-        # check downward diagonal
-        for row in range(0, self.__num_rows - 3):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row + 1][col + 1] == player and \
-                        self.__grid[row + 2][col + 2] == player and \
-                        self.__grid[row + 3][col + 3] == player:
-                    return True
+        """
+        the zobrist keys of each cell and player (the key of a checker is at (row * num_cols + col) * 2 + player)
+        and the hash of the grid and of its mirror image (the same keys, with the columns mirrored)
+        """
+        self.__zobrist_keys = get_zobrist_keys(self.__num_rows * self.__num_cols * 2)
+        self.__hash = 0
+        self.__mirror_hash = 0
 
+        """
+        the number of checkers of each player in each line and the score of all lines for each piece (see heuristic).
+        They are only kept once a heuristic is requested (None until then)
+        """
+        self.__line_counts = None
+        self.__line_scores = None
+
+    """
+    checks if the checker at a cell is part of four in a row (only the lines through the last checker can have
+    changed, so there is no need to scan the whole grid)
+    """
+    def __check_winner(self, row, col):
+        grid = self.__grid
+        player = grid[row][col]
+        for (r0, c0), (r1, c1), (r2, c2), (r3, c3) in self.__lines.get_lines_through(row, col):
+            if grid[r0][c0] == player and grid[r1][c1] == player and grid[r2][c2] == player and \
+                    grid[r3][c3] == player:
+                return True
         return False
 
     def get_grid(self):
@@ -97,66 +106,69 @@ class Connect4State(State):
             return False
 
         # full column
-        if self.__grid[0][col] != Connect4State.EMPTY_CELL:
+        if self.__heights[col] >= self.__num_rows:
             return False
 
         return True
 
+    """
+    Checks if dropping a checker in the column of a (valid) action would connect four, without changing the state
+    :param player: the player that drops the checker (by default, the acting player)
+    """
+    def is_winning_action(self, action: Connect4Action, player: int = None) -> bool:
+        if player is None:
+            player = self.__acting_player
+        col = action.get_col()
+        row = self.__num_rows - 1 - self.__heights[col]
+        grid = self.__grid
+        for (r0, c0), (r1, c1), (r2, c2), (r3, c3) in self.__lines.get_lines_through(row, col):
+            # the cell where the checker lands is empty, so the line is completed if the other three are the player's
+            if (grid[r0][c0] == player) + (grid[r1][c1] == player) + (grid[r2][c2] == player) + \
+                    (grid[r3][c3] == player) == 3:
+                return True
+        return False
+
     def update(self, action: Connect4Action):
         col = action.get_col()
 
         # drop the checker
-        for row in range(self.__num_rows - 1, -1, -1):
-            if self.__grid[row][col] < 0:
-                self.__grid[row][col] = self.__acting_player
-                break
+        row = self.__num_rows - 1 - self.__heights[col]
+        self.__grid[row][col] = self.__acting_player
+        self.__heights[col] += 1
+        self.__hash ^= self.__zobrist_keys[(row * self.__num_cols + col) * 2 + self.__acting_player]
+        self.__mirror_hash ^= self.__zobrist_keys[(row * self.__num_cols + self.__num_cols - 1 - col) * 2 +
+                                                  self.__acting_player]
+        if self.__line_counts is not None:
+            self.__add_to_lines(row, col, self.__acting_player)
 
         # determine if there is a winner
-        self.__has_winner = self.__check_winner(self.__acting_player)
+        self.__has_winner = self.__check_winner(row, col)
 
         # switch to next player
         self.__acting_player = 1 if self.__acting_player == 0 else 0
 
         self.__turns_count += 1
 
-    def __display_cell(self, row, col):
-        cell_value = self.__grid[row][col]
-        if cell_value == 0:
-            # Player 1 - Red
-            print(colored('●', 'red'), end="")
-        elif cell_value == 1:
-            # Player 2 - Blue
-            print(colored('○', 'blue'), end="")
-        else:
-            # Empty cell
-            print(' ', end="")
-
-    def __display_numbers(self):
-        for col in range(0, self.__num_cols):
-            if col < 10:
-                print(' ', end="")
-            print(col, end="")
-        print("")
-
-    def __display_separator(self):
-        for col in range(0, self.__num_cols):
-            print("--", end="")
-        print("-")
-
-    def display(self):
-        self.__display_numbers()
-        self.__display_separator()
+    def undo(self, action: Connect4Action):
+        col = action.get_col()
 
-        for row in range(0, self.__num_rows):
-            print('|', end="")
-            for col in range(0, self.__num_cols):
-                self.__display_cell(row, col)
-                print('|', end="")
-            print("")
-            self.__display_separator()
+        # remove the top checker of the column
+        self.__heights[col] -= 1
+        row = self.__num_rows - 1 - self.__heights[col]
+        self.__hash ^= self.__zobrist_keys[(row * self.__num_cols + col) * 2 + self.__grid[row][col]]
+        self.__mirror_hash ^= self.__zobrist_keys[(row * self.__num_cols + self.__num_cols - 1 - col) * 2 +
+                                                  self.__grid[row][col]]
+        if self.__line_counts is not None:
+            self.__remove_from_lines(row, col, self.__grid[row][col])
+        self.__grid[row][col] = Connect4State.EMPTY_CELL
+
+        # the game only goes on while there is no winner
+        self.__has_winner = False
+
+        # switch to the previous player
+        self.__acting_player = 1 if self.__acting_player == 0 else 0
 
-        self.__display_numbers()
-        print("")
+        self.__turns_count -= 1
 
     def __is_full(self):
         return self.__turns_count > (self.__num_cols * self.__num_rows)
@@ -172,6 +184,12 @@ class Connect4State(State):
         cloned_state.__turns_count = self.__turns_count
         cloned_state.__acting_player = self.__acting_player
         cloned_state.__has_winner = self.__has_winner
+        cloned_state.__hash = self.__hash
+        cloned_state.__mirror_hash = self.__mirror_hash
+        cloned_state.__heights = self.__heights.copy()
+        if self.__line_counts is not None:
+            cloned_state.__line_counts = [counts.copy() for counts in self.__line_counts]
+            cloned_state.__line_scores = self.__line_scores.copy()
         for row in range(0, self.__num_rows):
             for col in range(0, self.__num_cols):
                 cloned_state.__grid[row][col] = self.__grid[row][col]
@@ -184,6 +202,30 @@ class Connect4State(State):
             return Connect4Result.DRAW.value
         return None
 
+    def get_hash(self) -> int:
+        return self.__hash
+
+    """
+    Retrieves the hash of the position or the hash of its mirror image (across the center column), whichever is lower,
+    so both mirrors share it. Caches keyed on it keep one entry per pair of mirrors, so what they store must be the
+    same for both (e.g. scores of a symmetric evaluation, or of the board of the canonical one): actions stored with it
+    are in the columns of the lower one, and is_mirrored tells if they have to be mapped with get_mirror_col
+    """
+    def get_canonical_hash(self) -> int:
+        return min(self.__hash, self.__mirror_hash)
+
+    """
+    Checks if the canonical hash is the one of the mirror image of the position
+    """
+    def is_mirrored(self) -> bool:
+        return self.__mirror_hash < self.__hash
+
+    """
+    Retrieves the column that matches a column in the mirror image of the board
+    """
+    def get_mirror_col(self, col: int) -> int:
+        return self.__num_cols - 1 - col
+
     def get_num_rows(self):
         return self.__num_rows
 
@@ -194,65 +236,73 @@ class Connect4State(State):
         pass
 
     def get_possible_actions(self):
-        return list(filter(
-            lambda action: self.validate_action(action),
-            map(
-                lambda pos: Connect4Action(pos),
-                range(0, self.get_num_cols()))
-        ))
+        return [Connect4Action(col) for col in range(0, self.__num_cols) if self.__heights[col] < self.__num_rows]
 
-    def score_position(self, grid, piece):
-        score = 0
-
-        # Convertendo grid para um array NumPy
+    """
+    Computes the same score as score_position(get_grid(), piece), but from the number of checkers of each player in
+    each line. The first call starts keeping those counts, and from then on update and undo only change the lines
+    through the checker they add or remove
+    :param piece: the player (0 or 1) the position is scored for
+    """
+    def heuristic(self, piece):
+        if piece not in (0, 1):
+            return self.score_position(self.__grid, piece)
 
+        if self.__line_counts is None:
+            self.__count_lines()
 
         # Score center column
-        center_array = [int(i) for i in list(grid[:, grid.shape[1] // 2])]
-        center_count = center_array.count(piece)
-        score += center_count * 3
-
-        # Score Horizontal
-        for r in range(grid.shape[0]):
-            row_array = [int(i) for i in list(grid[r, :])]
-            for c in range(grid.shape[1] - 3):
-                window = row_array[c:c + 4]
-                score += self.evaluate_window(window, piece)
-
-        # Score Vertical
-        for c in range(grid.shape[1]):
-            col_array = [int(i) for i in list(grid[:, c])]
-            for r in range(grid.shape[0] - 3):
-                window = col_array[r:r + 4]
-                score += self.evaluate_window(window, piece)
-
-        # Score positive sloped diagonal
-        for r in range(grid.shape[0] - 3):
-            for c in range(grid.shape[1] - 3):
-                window = [grid[r + i][c + i] for i in range(4)]
-                score += self.evaluate_window(window, piece)
-
-        # Score negatively sloped diagonal
-        for r in range(grid.shape[0] - 3):
-            for c in range(grid.shape[1] - 3):
-                window = [grid[r + 3 - i][c + i] for i in range(4)]
-                score += self.evaluate_window(window, piece)
-
-        return score
-
-    def evaluate_window(self, window, piece):
-        score = 0
-        opponent_piece = 1 if piece == 2 else 2
-
-        if window.count(piece) == 4:
-            score += 100
-        elif window.count(piece) == 3 and window.count(0) == 1:
-            score += 5
-        elif window.count(piece) == 2 and window.count(0) == 2:
-            score += 2
-
-        if window.count(opponent_piece) == 3 and window.count(0) == 1:
-            score -= 4
-
-        return score
+        center_col = self.__num_cols // 2
+        center_count = sum(1 for row in self.__grid if row[center_col] == piece)
+
+        return center_count * 3 + self.__line_scores[piece]
+
+    def __count_lines(self):
+        if Connect4State.__heuristic_deltas is None:
+            Connect4State.__heuristic_deltas = self.__build_heuristic_deltas()
+
+        num_lines = self.__lines.get_num_lines()
+        self.__line_counts = [[0] * num_lines, [0] * num_lines]
 
+        # score of an empty line (for each piece) times the number of lines
+        scores = self.get_window_scores()
+        self.__line_scores = [scores[piece][0][0] * num_lines for piece in (0, 1)]
+
+        for row in range(0, self.__num_rows):
+            for col in range(0, self.__num_cols):
+                if self.__grid[row][col] >= 0:
+                    self.__add_to_lines(row, col, self.__grid[row][col])
+
+    """
+    keeps the difference made to the score of a window by adding a checker of each player
+    """
+    def __build_heuristic_deltas(self):
+        scores = self.get_window_scores()
+        deltas = [[[None] * 4 for _i in range(4)] for _player in (0, 1)]
+        for player in (0, 1):
+            for count0 in range(0, 4):
+                for count1 in range(0, 4 - count0):
+                    new_count0, new_count1 = (count0 + 1, count1) if player == 0 else (count0, count1 + 1)
+                    deltas[player][count0][count1] = tuple(
+                        scores[piece][new_count0][new_count1] - scores[piece][count0][count1] for piece in (0, 1))
+        return deltas
+
+    def __add_to_lines(self, row, col, player):
+        count0, count1 = self.__line_counts
+        deltas = Connect4State.__heuristic_deltas[player]
+        counts = self.__line_counts[player]
+        for index in self.__lines.get_line_indexes_through(row, col):
+            delta0, delta1 = deltas[count0[index]][count1[index]]
+            self.__line_scores[0] += delta0
+            self.__line_scores[1] += delta1
+            counts[index] += 1
+
+    def __remove_from_lines(self, row, col, player):
+        count0, count1 = self.__line_counts
+        deltas = Connect4State.__heuristic_deltas[player]
+        counts = self.__line_counts[player]
+        for index in self.__lines.get_line_indexes_through(row, col):
+            counts[index] -= 1
+            delta0, delta1 = deltas[count0[index]][count1[index]]
+            self.__line_scores[0] -= delta0
+            self.__line_scores[1] -= delta1
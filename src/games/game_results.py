@@ -0,0 +1,176 @@
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class GameResults:
+    """
+    Columnar store for the results of the games of a pairing. Instead of one dictionary per game, it keeps a typed
+    array per player (in the order of the pairing), plus the index of the seat permutation and the number of actions
+    of each game. Aggregates are computed with NumPy reductions over the columns, which are read in place (without
+    copies) as arrays of the same type.
+    """
+
+    """
+    permutation index of games whose seats are unknown (e.g. added from a dictionary of results)
+    """
+    UNKNOWN_PERMUTATION = 255
+
+    """
+    :param player_names: the names of the players, in the order of the pairing
+    :param permutations: for each seat permutation, the index of the player sitting in each seat
+    """
+    def __init__(self, player_names: list, permutations: list):
+        self.__player_names = list(player_names)
+        self.__permutations = [list(permutation) for permutation in permutations]
+
+        """
+        results start as integers and the columns switch to floats once a float result shows up
+        """
+        self.__columns = [array('q') for _name in self.__player_names]
+        self.__permutation_column = array('B')
+        self.__length_column = array('I')
+
+    def __len__(self):
+        return len(self.__permutation_column)
+
+    def get_player_names(self):
+        return self.__player_names
+
+    """
+    Adds the result of a game
+    :param results: the result of each player, in the order of the pairing
+    :param permutation: the index of the seat permutation of the game
+    :param length: the number of actions of the game
+    """
+    def append(self, results, permutation: int = UNKNOWN_PERMUTATION, length: int = 0):
+        if self.__columns[0].typecode == 'q' and any(isinstance(result, float) for result in results):
+            self.__to_float()
+        for column, result in zip(self.__columns, results):
+            column.append(result)
+        self.__permutation_column.append(permutation)
+        self.__length_column.append(length)
+
+    """
+    Adds all results of another store of the same pairing
+    """
+    def extend(self, other: 'GameResults'):
+        if other.get_player_names() != self.__player_names:
+            raise ValueError("can only merge the results of the same pairing")
+        other_columns = other.__columns
+        if self.__columns[0].typecode != other_columns[0].typecode:
+            if self.__columns[0].typecode == 'q':
+                self.__to_float()
+            else:
+                other_columns = [array('d', column) for column in other_columns]
+        for column, other_column in zip(self.__columns, other_columns):
+            column.extend(other_column)
+        self.__permutation_column.extend(other.__permutation_column)
+        self.__length_column.extend(other.__length_column)
+
+    def copy(self):
+        copied = GameResults(self.__player_names, self.__permutations)
+        copied.extend(self)
+        return copied
+
+    def __to_float(self):
+        self.__columns = [array('d', column) for column in self.__columns]
+
+    """
+    reads a column as a NumPy array that shares its memory (the column can't grow while the array is alive, so it
+    must only be kept within a reduction)
+    """
+    @staticmethod
+    def __as_numpy(column):
+        return np.frombuffer(column, dtype=column.typecode)
+
+    """
+    Retrieves the column with the results of a player
+    """
+    def get_column(self, name):
+        return self.__columns[self.__player_names.index(name)]
+
+    def get_permutation_column(self):
+        return self.__permutation_column
+
+    def get_length_column(self):
+        return self.__length_column
+
+    """
+    Retrieves the total score of each player
+    """
+    def get_totals(self):
+        return {name: GameResults.__as_numpy(column).sum().item()
+                for name, column in zip(self.__player_names, self.__columns)}
+
+    """
+    Retrieves the sum of the squared scores of each player
+    """
+    def get_square_totals(self):
+        squares = {}
+        for name, column in zip(self.__player_names, self.__columns):
+            values = GameResults.__as_numpy(column)
+            squares[name] = values.dot(values).item()
+        return squares
+
+    """
+    Retrieves the average score per game of each player
+    """
+    def get_means(self):
+        num_games = len(self)
+        return {name: total / num_games if num_games > 0 else 0 for name, total in self.get_totals().items()}
+
+    """
+    Retrieves the share of games with a positive result of each player
+    """
+    def get_win_rates(self):
+        num_games = len(self)
+        return {name: int(np.count_nonzero(GameResults.__as_numpy(column) > 0)) / num_games if num_games > 0 else 0
+                for name, column in zip(self.__player_names, self.__columns)}
+
+    """
+    Retrieves the total score of each player split by the seat they played in (games with unknown seats are left
+    out)
+    :return: a dictionary with a list of totals (one per seat) for each player
+    """
+    def get_seat_totals(self):
+        totals = {name: [0] * len(self.__player_names) for name in self.__player_names}
+        permutation_column = GameResults.__as_numpy(self.__permutation_column)
+        columns = [GameResults.__as_numpy(column) for column in self.__columns]
+        for index, permutation in enumerate(self.__permutations):
+            games = permutation_column == index
+            for seat, player in enumerate(permutation):
+                totals[self.__player_names[player]][seat] += columns[player][games].sum().item()
+        return totals
+
+    """
+    Retrieves the average number of actions per game
+    """
+    def get_mean_length(self):
+        return GameResults.__as_numpy(self.__length_column).sum().item() / len(self) if len(self) > 0 else 0
+
+    """
+    Retrieves a read-only view of the results as one dictionary per game, built when accessed
+    """
+    def as_dicts(self):
+        return GameResultsView(self)
+
+
+class GameResultsView(Sequence):
+    """
+    Compatibility view of a GameResults store as a list with a dictionary (player name -> result) per game
+    """
+
+    def __init__(self, results: GameResults):
+        self.__results = results
+
+    def __len__(self):
+        return len(self.__results)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return {name: self.__results.get_column(name)[index] for name in self.__results.get_player_names()}
@@ -1,7 +1,12 @@
+import time
+import weakref
 from abc import ABC, abstractmethod
 
+from games.game_results import GameResults
 from games.player import Player
 from games.state import State
+from games.state_view import StateView
+from games.time_control import TimeControl
 
 
 class GameSimulator(ABC):
@@ -22,8 +27,26 @@ class GameSimulator(ABC):
         # the selected permutation for the current game
         self.__current_permutation = 0
 
+        # the index of the player (in the order of the first permutation) sitting in each seat of each permutation
+        self.__seat_players = [[self.__permutations[0].index(player) for player in permutation]
+                               for permutation in self.__permutations]
+
         # the results of all games between all players
-        self.__results = []
+        self.__results = GameResults(names, self.__seat_players)
+
+        # running totals of the results of each player, so the scores don't have to be recomputed from every game
+        self.__num_games = 0
+        self.__score_sums = {name: 0 for name in names}
+        self.__score_squares = {name: 0 for name in names}
+
+        # views of the current game state that were given to the players
+        self.__views = []
+
+        # optional sink that receives a compact record of each game (e.g. a ResultLogWriter)
+        self.__result_sink = None
+
+        # optional time limits of the players (None for no limits)
+        self.__time_control = None
 
     """
     Adapted from https://www.geeksforgeeks.org/heaps-algorithm-for-generating-permutations/
@@ -112,10 +135,24 @@ class GameSimulator(ABC):
         state = self.on_init_game()
         players = self.get_player_positions()
 
+        # the players that subscribed to each event
+        new_game_listeners = [player for player in players if 'event_new_game' in player.get_subscribed_events()]
+        action_listeners = [player for player in players if 'event_action' in player.get_subscribed_events()]
+        result_listeners = [player for player in players if 'event_result' in player.get_subscribed_events()]
+        end_game_listeners = [player for player in players if 'event_end_game' in player.get_subscribed_events()]
+
         # notify players a new game is starting
         for pos in range(0, len(players)):
             players[pos].set_current_pos(pos)
-            players[pos].event_new_game()
+        for player in new_game_listeners:
+            player.event_new_game()
+
+        # number of actions played in the game
+        length = 0
+
+        # what is left of the game clock of each seat (None if there is no game clock)
+        time_control = self.__time_control
+        clocks = [time_control.get_game_time() if time_control is not None else None] * len(players)
 
         # play a turn
         while not state.is_finished():
@@ -123,44 +160,85 @@ class GameSimulator(ABC):
             pos = state.get_acting_player()
 
             # obtain a valid action
+            if time_control is not None:
+                players[pos].set_time_budget(time_control.get_budget(clocks[pos]))
+                start = time.perf_counter()
             while True:
-                selected_action = players[pos].get_action(state.clone())
+                selected_action = players[pos].get_action(self.__get_view(state))
                 if state.validate_action(selected_action):
                     break
+            if clocks[pos] is not None:
+                clocks[pos] -= 1000 * (time.perf_counter() - start)
 
+            self.__detach_views()
             state.play(selected_action)
+            length += 1
 
             # notify players of the action
-            for player in players:
-                player.event_action(pos, selected_action, state.clone())
+            for player in action_listeners:
+                player.event_action(pos, selected_action, self.__get_view(state))
 
             # the simulator will run an optional hanlder for each updated state
             self.on_state_update(state)
 
         # handler to run before the game ends
+        self.__detach_views()
         self.on_before_end_game(state)
 
-        result = {}
         for player in players:
             # notify the player of the result in each position
-            for pos in range(len(players)):
-                player.event_result(pos, state.get_result(pos))
+            if player in result_listeners:
+                for pos in range(len(players)):
+                    player.event_result(pos, state.get_result(pos))
+
+            if player in end_game_listeners:
+                player.event_end_game(self.__get_view(state))
 
-            # store the result for that player
-            result[player.get_name()] = state.get_result(player.get_current_pos())
-            player.event_end_game(state.clone())
+        # store the result of each player, in the order of the first permutation
+        seat_results = [state.get_result(pos) for pos in range(len(players))]
+        result = [None] * len(players)
+        for pos, player in enumerate(self.__seat_players[self.__current_permutation]):
+            result[player] = seat_results[pos]
 
-        self.__results.append(result)
+        self.__add_result(result, length)
+        self.__views.clear()
+
+        if self.__result_sink is not None:
+            self.__result_sink.write(self.__seat_players[self.__current_permutation], seat_results, length)
 
         # handler to run after a game ends
         self.on_end_game(state)
 
+    # creates a read-only view of the state for a player, instead of cloning it
+    def __get_view(self, state):
+        view = StateView(state)
+        self.__views.append(weakref.ref(view))
+        return view
+
+    # gives a copy of the state to the views that players kept, before the state changes
+    def __detach_views(self):
+        for view_reference in self.__views:
+            view = view_reference()
+            if view is not None:
+                view.detach()
+        self.__views.clear()
+
+    # stores the result of a game (the result of each player, in the order of the first permutation) and updates the
+    # running totals
+    def __add_result(self, result, length):
+        self.__results.append(result, self.__current_permutation, length)
+        self.__num_games += 1
+        for player, score in zip(self.__permutations[0], result):
+            name = player.get_name()
+            self.__score_sums[name] += score
+            self.__score_squares[name] += score * score
+
     # prints the stats for all players
     def print_stats(self):
         scores = self.get_global_score()
         for player in self.__permutations[0]:
             name = player.get_name()
-            print(f"Player {name} | Total score: {scores[name]}$ | Avg. score per game: {scores[name] / len(self.__results)}$")
+            print(f"Player {name} | Total score: {scores[name]}$ | Avg. score per game: {scores[name] / self.__num_games}$")
 
     # returns the list of players
     def get_players(self):
@@ -170,23 +248,79 @@ class GameSimulator(ABC):
     def get_player_positions(self):
         return self.__permutations[self.__current_permutation]
 
+    # returns the index of the current permutation
+    def get_current_permutation(self):
+        return self.__current_permutation
+
+    # sets the current permutation (e.g. to continue a run that was saved)
+    def set_current_permutation(self, permutation: int):
+        self.__current_permutation = permutation % len(self.__permutations)
+
+    # sets the time limits of the players in the games played from now on (None for no limits)
+    def set_time_control(self, time_control: TimeControl):
+        self.__time_control = time_control
+
+    # gets the time limits of the players
+    def get_time_control(self):
+        return self.__time_control
+
+    # gets what the simulator carries from one game to the next (e.g. the order of a deck that is shuffled in place),
+    # so a run can be saved and continued with set_simulator_state. None for simulators whose games are independent
+    def get_simulator_state(self):
+        return None
+
+    # restores what get_simulator_state returned
+    def set_simulator_state(self, simulator_state):
+        pass
+
     # gets the number os players
     def num_players(self):
         return len(self.__permutations[0])
 
-    # gets the results of all games
+    # gets the results of all games, as a list with a dictionary (player name -> result) per game
     def get_results(self):
+        return self.__results.as_dicts()
+
+    # gets the columnar store with the results of all games
+    def get_game_results(self):
         return self.__results
 
+    # sets the sink that will receive the record of each game played from now on (None to stop writing them)
+    def set_result_sink(self, sink):
+        self.__result_sink = sink
+
+    # adds the results of games that were played elsewhere (e.g. by another process), either as a GameResults store
+    # of the same players or as a list with a dictionary (player name -> result) per game
+    def add_results(self, results):
+        if not isinstance(results, GameResults):
+            game_results = GameResults(self.__results.get_player_names(), self.__seat_players)
+            for result in results:
+                game_results.append([result[player.get_name()] for player in self.__permutations[0]])
+            results = game_results
+
+        self.__results.extend(results)
+
+        # the running totals are updated with reductions over the added columns
+        self.__num_games += len(results)
+        for name, total in results.get_totals().items():
+            self.__score_sums[name] += total
+        for name, total in results.get_square_totals().items():
+            self.__score_squares[name] += total
+
+    # gets the number of games that were played
+    def get_num_games(self):
+        return self.__num_games
+
     # gets the scores of all players
     def get_global_score(self):
-        scores = {}
-        for player in self.__permutations[0]:
-            name = player.get_name()
-            scores[name] = 0
-            for result in self.__results:
-                scores[name] += result[name]
-        return scores
+        return self.__score_sums.copy()
+
+    # gets the sample variance of the score per game of all players
+    def get_score_variance(self):
+        if self.__num_games < 2:
+            return {name: 0 for name in self.__score_sums}
+        return {name: (self.__score_squares[name] - self.__score_sums[name] ** 2 / self.__num_games) / (self.__num_games - 1)
+                for name in self.__score_sums}
 
 
     @staticmethod
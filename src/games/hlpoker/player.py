@@ -10,6 +10,12 @@ from games.player import Player
 
 class HLPokerPlayer(Player, ABC):
 
+    """
+    besides the events of every player, poker players are notified of each new betting round. The cards shown by
+    the simulator are always delivered, since the player keeps track of them
+    """
+    EVENTS = Player.EVENTS + ('event_new_round',)
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -50,7 +56,8 @@ class HLPokerPlayer(Player, ABC):
         self.__opponent_cards = [None, None]
         self.__board_cards = []
         self.__current_round = Round.Preflop
-        self.event_new_round(self.__current_round)
+        if 'event_new_round' in self.get_subscribed_events():
+            self.event_new_round(self.__current_round)
 
     def event_result(self, pos: int, result: int):
         if pos == self.get_current_pos():
@@ -85,7 +92,8 @@ class HLPokerPlayer(Player, ABC):
     def event_show_board_cards(self, cards: [Card], round):
         self.__board_cards.extend(cards)
         self.__current_round = round
-        self.event_new_round(self.__current_round)
+        if 'event_new_round' in self.get_subscribed_events():
+            self.event_new_round(self.__current_round)
 
     def print_stats(self):
         print(
@@ -136,6 +144,16 @@ class HLPokerPlayer(Player, ABC):
         else:
             self.event_opponent_action(action, new_state)
 
+    """
+    event_action only forwards the actions to event_my_action and event_opponent_action, so it is only needed if
+    one of them is implemented
+    """
+    @classmethod
+    def is_subscribed(cls, event) -> bool:
+        if event == 'event_action' and cls.event_action is HLPokerPlayer.event_action:
+            return super().is_subscribed('event_my_action') or super().is_subscribed('event_opponent_action')
+        return super().is_subscribed(event)
+
     """
     this method should be implemented in the child class.
     gets called at the start of a new game to indicate to the player 
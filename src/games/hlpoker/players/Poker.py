@@ -15,6 +15,8 @@ class PokerPlayer(HLPokerPlayer):
         self.current_cards = []
 
     def get_action_with_cards(self, state: HLPokerState, private_cards, board_cards):
+        # the hands are simulated in place on a private copy of the state
+        state = state.clone()
         possible_actions = list(state.get_possible_actions())
         action_results = {action: [] for action in possible_actions}
         hand_evaluation = 0
@@ -75,18 +77,23 @@ class PokerPlayer(HLPokerPlayer):
         return num_wins / num_simulations
 
     def simulate_hand(self, state: HLPokerState, action: HLPokerAction):
-        simulated_state = state.clone()
-        simulated_state.update(action)
-        while not simulated_state.is_finished():
-            possible_actions = simulated_state.get_possible_actions()
+        # the hand is played on the state itself and reverted at the end
+        num_actions = 1
+        state.push(action)
+        while not state.is_finished():
+            possible_actions = state.get_possible_actions()
             if HLPokerAction.CALL in possible_actions:
                 # If the opponent always calls, choose call if it's a possible action
                 opponent_action = HLPokerAction.CALL
             else:
                 # If call is not a possible action, choose a random action
                 opponent_action = random.choice(possible_actions)
-            simulated_state.update(opponent_action)
-        return simulated_state.get_result(self.get_current_pos()) + self.evaluate_hand(self.current_cards)
+            state.push(opponent_action)
+            num_actions += 1
+        result = state.get_result(self.get_current_pos())
+        for _ in range(num_actions):
+            state.pop()
+        return result + self.evaluate_hand(self.current_cards)
 
     @staticmethod
     def evaluate_hand(hand):
@@ -19,23 +19,31 @@ class ExpectimaxPokerPlayer(HLPokerPlayer):
         super().__init__(name)
 
     def get_action_with_cards(self, state: HLPokerState, private_cards, board_cards):
+        # the search walks the tree in place (with push and pop) on a private copy of the state
+        state = state.clone()
         possible_actions = list(state.get_possible_actions())
-        action_values = {action: self.expectimax(state.clone(), action, float('-inf'), float('inf')) for action in possible_actions}
+        action_values = {action: self.expectimax(state, action, float('-inf'), float('inf')) for action in possible_actions}
         best_action = max(action_values, key=action_values.get)
         return best_action
 
     def expectimax(self, state: HLPokerState, action: HLPokerAction, alpha: float, beta: float):
-        next_state = state.clone()
-        next_state.update(action)
+        state.push(action)
+        value = self.expectimax_after(state, alpha, beta)
+        state.pop()
+        return value
 
-        if next_state.is_finished():
-            return next_state.get_result(self.get_current_pos())
+    """
+    evaluates the state reached after an action (the state is left as it is)
+    """
+    def expectimax_after(self, state: HLPokerState, alpha: float, beta: float):
+        if state.is_finished():
+            return state.get_result(self.get_current_pos())
 
-        if next_state.get_acting_player() == self.get_current_pos():
+        if state.get_acting_player() == self.get_current_pos():
             # Max node
             value = float('-inf')
-            for action in next_state.get_possible_actions():
-                value = max(value, self.expectimax(next_state.clone(), action, alpha, beta))
+            for action in state.get_possible_actions():
+                value = max(value, self.expectimax(state, action, alpha, beta))
                 alpha = max(alpha, value)
                 if alpha >= beta:
                     break  # beta cut-off
@@ -43,11 +51,12 @@ class ExpectimaxPokerPlayer(HLPokerPlayer):
         else:
             # Chance node
             value = 0
-            for action in next_state.get_possible_actions():
-                value += self.expectimax(next_state.clone(), action, alpha, beta)
+            possible_actions = state.get_possible_actions()
+            for action in possible_actions:
+                value += self.expectimax(state, action, alpha, beta)
                 if value >= beta:
                     break  # alpha cut-off
-            return value / len(next_state.get_possible_actions())
+            return value / len(possible_actions)
 
     def event_new_round(self, round: Round):
         pass
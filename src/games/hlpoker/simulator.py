@@ -81,6 +81,13 @@ class HLPokerSimulator(GameSimulator):
         # ignored for this simulator
         pass
 
+    def get_simulator_state(self):
+        # each game shuffles the deck in the order the previous one left it
+        return list(self.__deck)
+
+    def set_simulator_state(self, simulator_state):
+        self.__deck = list(simulator_state)
+
     @staticmethod
     def get_player_type():
         return HLPokerPlayer
@@ -8,6 +8,16 @@ class HLPokerState(State):
     BET_SIZE = 1.0
     MAX_RAISES = 4
 
+    """
+    the betting sequence is hashed with 64-bit FNV-1a over the values of its actions
+    """
+    HASH_OFFSET = 0xCBF29CE484222325
+    HASH_PRIME = 0x100000001B3
+    HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+    VIEW_SAFE_METHODS = State.VIEW_SAFE_METHODS | {'get_pot', 'is_showdown', 'get_current_round', 'get_spent',
+                                                   'get_possible_actions'}
+
     def __init__(self, num_players: int):
         super().__init__()
 
@@ -52,6 +62,14 @@ class HLPokerState(State):
         number of actions in the current round.
         """
         self.__winner = None
+        """
+        the values each update changed, as they were before it, so that it can be undone
+        """
+        self.__history = []
+        """
+        the hash of the sequence of actions
+        """
+        self.__hash = HLPokerState.HASH_OFFSET
 
     def get_num_players(self):
         return self.__num_players
@@ -71,8 +89,14 @@ class HLPokerState(State):
         return True
 
     def update(self, action):
+        # remember what the action is going to change
+        self.__history.append((self.__acting_player, self.__is_finished, self.__bets[0], self.__bets[1],
+                               self.__round, self.__raise_count, self.__actions_this_round, self.__winner,
+                               self.__hash))
+
         # update sequence of actions
         self.__sequence.append(action)
+        self.__hash = ((self.__hash ^ action.value) * HLPokerState.HASH_PRIME) & HLPokerState.HASH_MASK
 
         # update the number of actions in the current round
         self.__actions_this_round += 1
@@ -115,6 +139,11 @@ class HLPokerState(State):
         if self.__round == Round.Showdown:
             self.__is_finished = True
 
+    def undo(self, action):
+        self.__sequence.pop()
+        self.__acting_player, self.__is_finished, self.__bets[0], self.__bets[1], self.__round, \
+            self.__raise_count, self.__actions_this_round, self.__winner, self.__hash = self.__history.pop()
+
     def display(self):
         for action in self.__sequence:
             print(f"{action}", end=" > ")
@@ -143,6 +172,8 @@ class HLPokerState(State):
         cloned.__num_players = self.__num_players
         cloned.__actions_this_round = self.__actions_this_round
         cloned.__winner = self.__winner
+        cloned.__history = self.__history.copy()
+        cloned.__hash = self.__hash
         return cloned
 
     def get_result(self, pos):
@@ -162,6 +193,9 @@ class HLPokerState(State):
     def is_showdown(self):
         return self.__round == Round.Showdown
 
+    def get_hash(self) -> int:
+        return self.__hash
+
     def get_sequence(self):
         return self.__sequence
 
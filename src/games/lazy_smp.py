@@ -0,0 +1,149 @@
+import multiprocessing
+import weakref
+from multiprocessing import shared_memory
+
+from games.transposition_table import TranspositionTable
+
+"""
+whether the searches of this process may start helper processes (see LazySMP.set_enabled)
+"""
+_enabled = True
+
+
+class LazySMP:
+    """
+    Parallel search in the Lazy SMP style: helper copies of a search player run in worker processes and search the
+    same position as the player, at the same time, sharing its transposition table through shared memory. The work
+    isn't split between them: the helpers fill the table with results that the player finds when its search gets
+    there. Each helper starts at a different depth or with a different first move, so they don't all search the same
+    nodes.
+
+    The player class must accept the tt_memory and tt_buffer arguments (the size and the memory of its transposition
+    table), and implement set_helper(index, stop_flag), get_depth_reached and get_num_nodes. A helper must stop its
+    search as soon as the stop flag (a shared byte) is set.
+
+    Players only start their helpers when is_enabled: processes that already play in parallel with others (e.g. the
+    workers of main.py) disable it, so the machine isn't oversubscribed, and their players search alone.
+    """
+
+    """
+    :param player_class: the class of the search player
+    :param num_helpers: the number of helper processes
+    :param tt_memory: the size of the shared transposition table, in bytes
+    :param player_args: other arguments of the helpers (e.g. max_depth)
+    """
+    def __init__(self, player_class, num_helpers: int, tt_memory: int, **player_args):
+        self.__memory = shared_memory.SharedMemory(create=True, size=TranspositionTable.get_buffer_size(tt_memory))
+
+        """
+        the transposition table of the player, over the shared memory
+        """
+        self.__table = TranspositionTable(tt_memory, self.__memory.buf)
+
+        """
+        set while the helpers have to stop searching
+        """
+        self.__stop_flag = multiprocessing.Value('b', 0, lock=False)
+
+        """
+        the connection to each helper, and its process
+        """
+        self.__connections = []
+        processes = []
+        for index in range(1, num_helpers + 1):
+            connection, helper_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_helper, daemon=True,
+                                              args=(player_class, player_args, tt_memory, self.__memory,
+                                                    self.__stop_flag, helper_connection, index))
+            process.start()
+            helper_connection.close()
+            self.__connections.append(connection)
+            processes.append(process)
+
+        # the helpers are stopped and the shared memory released once the search is no longer used
+        self.__finalizer = weakref.finalize(self, LazySMP.__shutdown, self.__memory, self.__table, self.__connections,
+                                            processes)
+
+    """
+    Retrieves the shared transposition table, for the player (it can't be used once the search is closed)
+    """
+    def get_table(self):
+        return self.__table
+
+    def get_num_helpers(self):
+        return len(self.__connections)
+
+    """
+    Starts the helpers on a position
+    :param state: the position (the helpers search their own copy)
+    :param pos: the position of the player
+    :param budget: the time budget of the player (see Player.get_time_budget)
+    """
+    def start_search(self, state, pos: int, budget):
+        self.__stop_flag.value = 0
+        for connection in self.__connections:
+            connection.send((state, pos, budget))
+
+    """
+    Stops the helpers and waits for them
+    :return: the depth reached by each helper and the total number of nodes they searched
+    """
+    def stop_search(self):
+        self.__stop_flag.value = 1
+        results = [connection.recv() for connection in self.__connections]
+        return [depth for depth, _nodes in results], sum(nodes for _depth, nodes in results)
+
+    def close(self):
+        self.__finalizer()
+
+    """
+    Allows or forbids the searches of this process to start helpers
+    """
+    @staticmethod
+    def set_enabled(enabled: bool):
+        global _enabled
+        _enabled = enabled
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return _enabled
+
+    @staticmethod
+    def __shutdown(memory, table, connections, processes):
+        for connection in connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        # the views of the table are released first, or the memory can't be unmapped
+        table.release()
+        memory.close()
+        memory.unlink()
+
+
+"""
+Runs a helper: it searches each position it receives until it is told to stop
+"""
+def _run_helper(player_class, player_args, tt_memory, memory, stop_flag, connection, index):
+    player = player_class(f"helper {index}", tt_memory=tt_memory, tt_buffer=memory.buf, **player_args)
+    player.set_helper(index, stop_flag)
+
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        state, pos, budget = task
+        player.set_current_pos(pos)
+        player.set_time_budget(budget)
+        nodes = player.get_num_nodes()
+        player.get_action(state)
+        connection.send((player.get_depth_reached(), player.get_num_nodes() - nodes))
@@ -5,12 +5,16 @@ from termcolor import colored
 from games.minesweeper.action import MinesweeperAction
 from games.minesweeper.result import MinesweeperResult
 from games.state import State
+from games.zobrist import get_zobrist_keys
 
 
 class MinesweeperState(State):
     EMPTY_CELL = -1
     MINE_CELL = -2
 
+    # get_possible_actions is left out because its generator reads the grid after it is returned
+    VIEW_SAFE_METHODS = State.VIEW_SAFE_METHODS | {'get_num_rows', 'get_num_cols'}
+
     def __init__(self, num_rows: int = 7, num_cols: int = 7, num_mines: int = 11):
         super().__init__()
 
@@ -38,6 +42,13 @@ class MinesweeperState(State):
         self.__mines_hit = [0, 0]
         self.__has_winner = False
 
+        """
+        the zobrist keys of each cell and player (the key of a revealed cell is at (row * num_cols + col) * 2 + the
+        player that revealed it) and the hash of the revealed cells
+        """
+        self.__zobrist_keys = get_zobrist_keys(self.__num_rows * self.__num_cols * 2)
+        self.__hash = 0
+
     def __place_mines(self):
         mines = set()
         while len(mines) < self.__num_mines:
@@ -67,6 +78,7 @@ class MinesweeperState(State):
     def update(self, action: MinesweeperAction):
         row, col = action.get_row(), action.get_col()
         self.__grid_players[row][col] = self.__acting_player
+        self.__hash ^= self.__zobrist_keys[(row * self.__num_cols + col) * 2 + self.__acting_player]
 
         if (row, col) in self.__mines:
             self.__grid[row][col] = MinesweeperState.MINE_CELL
@@ -77,6 +89,20 @@ class MinesweeperState(State):
         self.__acting_player = 1 - self.__acting_player
         self.__has_winner = len(self.__mines) == sum(self.__mines_hit)
 
+    def undo(self, action: MinesweeperAction):
+        row, col = action.get_row(), action.get_col()
+
+        # switch to the previous player
+        self.__acting_player = 1 - self.__acting_player
+
+        if self.__grid[row][col] == MinesweeperState.MINE_CELL:
+            self.__mines_hit[self.__acting_player] -= 1
+
+        self.__hash ^= self.__zobrist_keys[(row * self.__num_cols + col) * 2 + self.__acting_player]
+        self.__grid[row][col] = MinesweeperState.EMPTY_CELL
+        self.__grid_players[row][col] = MinesweeperState.EMPTY_CELL
+        self.__has_winner = len(self.__mines) == sum(self.__mines_hit)
+
     def validate_action(self, action: MinesweeperAction) -> bool:
         row, col = action.get_row(), action.get_col()
 
@@ -144,6 +170,7 @@ class MinesweeperState(State):
         cloned_state.__acting_player = self.__acting_player
         cloned_state.__mines_hit = self.__mines_hit.copy()
         cloned_state.__has_winner = self.__has_winner
+        cloned_state.__hash = self.__hash
         for row in range(0, self.__num_rows):
             for col in range(0, self.__num_cols):
                 cloned_state.__grid[row][col] = self.__grid[row][col]
@@ -153,6 +180,9 @@ class MinesweeperState(State):
     def get_result(self, pos):
         return MinesweeperResult.WIN.value if self.__mines_hit[pos] < self.__mines_hit[1 - pos] else MinesweeperResult.LOOSE.value
 
+    def get_hash(self) -> int:
+        return self.__hash
+
     def get_num_rows(self):
         return self.__num_rows
 
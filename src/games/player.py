@@ -1,10 +1,41 @@
+import dis
 from abc import ABC, abstractmethod
 
 from games.state import State
 
 
+def _no_op(*args):
+    pass
+
+
+"""
+the instructions of a function, with the value of their arguments (a docstring moves the index of the None constant
+in the bytecode, but not its value)
+"""
+def _get_instructions(code):
+    return [(instruction.opname, instruction.argval) for instruction in dis.get_instructions(code)]
+
+
+"""
+Checks if a method does nothing (its body is only pass, a docstring or both)
+"""
+def is_no_op(method) -> bool:
+    code = getattr(method, '__code__', None)
+    return code is not None and _get_instructions(code) == _get_instructions(_no_op.__code__)
+
+
 class Player(ABC):
 
+    """
+    the events a player can be notified of by the simulator
+    """
+    EVENTS = ('event_new_game', 'event_action', 'event_result', 'event_end_game')
+
+    """
+    cache of the events each player class subscribes to
+    """
+    __subscribed_events = {}
+
     """
     :param name: name of the player (simply a text identifier for the player)
     """
@@ -16,6 +47,9 @@ class Player(ABC):
         # in most games, the first player takes the position 0
         self.__current_pos = None
 
+        # time the player can spend on its current move, in milliseconds (None if the game has no time control)
+        self.__time_budget = None
+
     """
     retrieves the name of the player
     """
@@ -35,6 +69,41 @@ class Player(ABC):
     def set_current_pos(self, new_pos):
         self.__current_pos = new_pos
 
+    """
+    retrieves the time the player can spend on its current move, in milliseconds, or None if there is no limit.
+    The simulator sets it before each call to get_action when the game has a time control (see TimeControl)
+    """
+    def get_time_budget(self):
+        return self.__time_budget
+
+    """
+    sets the time the player can spend on its current move
+    :param budget: the budget in milliseconds, or None for no limit
+    """
+    def set_time_budget(self, budget):
+        self.__time_budget = budget
+
+    """
+    retrieves the events that the player subscribes to, i.e. the ones it implements with something other than pass.
+    The simulator doesn't notify a player of the other events (nor copies the state for them).
+    This is only detected once per class
+    """
+    @classmethod
+    def get_subscribed_events(cls):
+        events = Player.__subscribed_events.get(cls)
+        if events is None:
+            events = frozenset(event for event in cls.EVENTS if cls.is_subscribed(event))
+            Player.__subscribed_events[cls] = events
+        return events
+
+    """
+    checks if the class subscribes to an event
+    :param event: the name of the event method
+    """
+    @classmethod
+    def is_subscribed(cls, event) -> bool:
+        return not is_no_op(getattr(cls, event))
+
     """
     prints to the console the stats of the player
     """
@@ -0,0 +1,175 @@
+import json
+import mmap
+import os
+import struct
+
+"""
+identifies the files written by ResultLogWriter
+"""
+MAGIC = b'GRL1'
+
+"""
+the header starts with the magic, the number of seats and the size of the json that describes the players
+"""
+HEADER = struct.Struct('<4sHI')
+
+"""
+upper bound for the size of the json in the header
+"""
+MAX_DESCRIPTION_SIZE = 1 << 16
+
+
+"""
+Builds the layout of a game record for a number of seats: pairing id, game length (number of actions), the index
+of the player (in the order of the pairing) sitting in each seat and the result of each seat
+"""
+def get_record_struct(num_seats: int):
+    return struct.Struct(f'<II{num_seats}B{num_seats}d')
+
+
+class ResultLogWriter:
+    """
+    Appends fixed-width binary records with the result of each game to a file. Records are buffered and written in
+    batches, so a run with millions of games neither keeps them in memory nor does a write per game.
+    """
+
+    """
+    :param path: the file to write
+    :param pairing_id: number that identifies the pairing in the records
+    :param player_names: names of the players of the pairing, in the order of the pairing
+    :param num_records: number of records to keep from an existing file (e.g. when resuming). If None, the file is
+    created from scratch
+    :param batch_size: number of records buffered before writing them to the file
+    """
+    def __init__(self, path, pairing_id: int, player_names: list, num_records: int = None, batch_size: int = 1024):
+        self.__pairing_id = pairing_id
+        self.__record = get_record_struct(len(player_names))
+        self.__batch_size = batch_size
+        self.__buffer = bytearray()
+        self.__buffered = 0
+
+        if num_records is not None and os.path.exists(path):
+            self.__file = open(path, 'r+b')
+            header_size = read_header(self.__file.read(HEADER.size + MAX_DESCRIPTION_SIZE))[2]
+            self.__file.truncate(header_size + num_records * self.__record.size)
+            self.__file.seek(0, os.SEEK_END)
+        else:
+            description = json.dumps({'pairing_id': pairing_id, 'players': player_names}).encode()
+            self.__file = open(path, 'wb')
+            self.__file.write(HEADER.pack(MAGIC, len(player_names), len(description)) + description)
+
+    """
+    Adds the record of a game
+    :param permutation: the index of the player sitting in each seat
+    :param results: the result of each seat
+    :param length: the number of actions of the game
+    """
+    def write(self, permutation, results, length):
+        self.__buffer += self.__record.pack(self.__pairing_id, length, *permutation, *results)
+        self.__buffered += 1
+        if self.__buffered >= self.__batch_size:
+            self.flush()
+
+    """
+    Writes the buffered records to the file
+    """
+    def flush(self):
+        if self.__buffered > 0:
+            self.__file.write(self.__buffer)
+            self.__buffer.clear()
+            self.__buffered = 0
+        self.__file.flush()
+
+    def close(self):
+        self.flush()
+        self.__file.close()
+
+
+class ResultLogReader:
+    """
+    Reads a file written by ResultLogWriter. The file is memory-mapped, so aggregating the scores doesn't load
+    the records into python objects.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size + MAX_DESCRIPTION_SIZE)
+            self.__num_seats, description, self.__header_size = read_header(header)
+
+            # an empty log can't be memory-mapped
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) \
+                if os.fstat(file.fileno()).st_size > self.__header_size else b''
+
+        self.__pairing_id = description['pairing_id']
+        self.__player_names = description['players']
+        self.__record = get_record_struct(self.__num_seats)
+
+    def get_pairing_id(self):
+        return self.__pairing_id
+
+    def get_player_names(self):
+        return self.__player_names
+
+    """
+    Retrieves the number of complete records (a partial record at the end, left by an interrupted write, is ignored)
+    """
+    def get_num_records(self):
+        return (len(self.__data) - self.__header_size) // self.__record.size if self.__data else 0
+
+    """
+    Iterates over the records as (pairing_id, length, permutation, results) tuples
+    """
+    def records(self):
+        if not self.__data:
+            return
+        end = self.__header_size + self.get_num_records() * self.__record.size
+        for values in self.__record.iter_unpack(memoryview(self.__data)[self.__header_size:end]):
+            yield values[0], values[1], values[2:2 + self.__num_seats], values[2 + self.__num_seats:]
+
+    """
+    Aggregates the records by player
+    :return: a dictionary with the total score, the sum of squared scores and the number of games of each player
+    """
+    def aggregate(self):
+        totals = {name: {'score': 0, 'squares': 0, 'games': 0} for name in self.__player_names}
+        for _pairing_id, _length, permutation, results in self.records():
+            for player_index, result in zip(permutation, results):
+                player_totals = totals[self.__player_names[player_index]]
+                player_totals['score'] += result
+                player_totals['squares'] += result * result
+                player_totals['games'] += 1
+        return totals
+
+    def close(self):
+        if self.__data:
+            self.__data.close()
+
+
+"""
+Parses the header of a log
+:return: the number of seats, the json description of the pairing and the size of the header
+"""
+def read_header(data: bytes):
+    magic, num_seats, description_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a game result log")
+    description = json.loads(data[HEADER.size:HEADER.size + description_size])
+    return num_seats, description, HEADER.size + description_size
+
+
+"""
+Aggregates the scores of several logs (e.g. one per shard) by player
+:param paths: the files to read
+:return: a dictionary with the total score, the sum of squared scores and the number of games of each player
+"""
+def aggregate_result_logs(paths):
+    totals = {}
+    for path in paths:
+        reader = ResultLogReader(path)
+        for name, player_totals in reader.aggregate().items():
+            if name not in totals:
+                totals[name] = {'score': 0, 'squares': 0, 'games': 0}
+            for key, value in player_totals.items():
+                totals[name][key] += value
+        reader.close()
+    return totals
@@ -3,6 +3,19 @@ from abc import ABC, abstractmethod
 
 class State(ABC):
 
+    """
+    Methods that don't change the state nor return its internal structures, so they can be called on the live state
+    through a StateView (subclasses extend this set with their own methods)
+    """
+    VIEW_SAFE_METHODS = frozenset(['get_num_players', 'validate_action', 'display', 'is_finished',
+                                   'get_acting_player', 'get_result', 'get_hash'])
+
+    def __init__(self):
+        """
+        the actions applied with push that weren't reverted yet
+        """
+        self.__pushed_actions = []
+
     """
     Retrieve the number of players
     """
@@ -58,6 +71,39 @@ class State(ABC):
         self.update(action)
         return True
 
+    """
+    Reverts an update, restoring the state as it was before it
+    :param action: the action of the last update applied to the state (updates are reverted in reverse order)
+    """
+    @abstractmethod
+    def undo(self, action):
+        pass
+
+    """
+    Retrieves a 64-bit hash of the state, maintained incrementally as actions are applied and undone, so that it can
+    be used as the key of transposition tables and caches
+    """
+    @abstractmethod
+    def get_hash(self) -> int:
+        pass
+
+    """
+    Updates the game state with an action that can later be reverted with pop. Searches walk the game tree on a
+    single state with push and pop instead of cloning it at every node
+    """
+    def push(self, action):
+        self.update(action)
+        self.__pushed_actions.append(action)
+
+    """
+    Reverts the last action applied with push
+    :returns: the reverted action
+    """
+    def pop(self):
+        action = self.__pushed_actions.pop()
+        self.undo(action)
+        return action
+
     """
     copies the current game state
     """
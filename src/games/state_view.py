@@ -0,0 +1,57 @@
+class StateView:
+    """
+    Copy-on-write view of a game state, given to the players instead of a clone.
+
+    Methods listed in the VIEW_SAFE_METHODS of the state (which neither change the state nor return its internal
+    structures) are forwarded to the live state. Any other method (e.g. update or get_grid) is called on a private
+    copy, made the first time it is needed, so players can still change what they get without affecting the game.
+
+    Copying (copy.copy, copy.deepcopy) or pickling a view gives a real state, like clone does. A view isn't an
+    instance of the class of the state, though.
+    """
+
+    def __init__(self, state):
+        self.__state = state
+        self.__copy = None
+
+    """
+    Makes the view independent from the live state. The owner of the state calls this before changing it, so
+    views that players kept keep showing the state they were given
+    """
+    def detach(self):
+        if self.__copy is None:
+            self.__copy = self.__state.clone()
+
+    """
+    copies the state (this is always a real copy)
+    """
+    def clone(self):
+        return self.__state.clone() if self.__copy is None else self.__copy.clone()
+
+    """
+    copies and pickles are real states
+    """
+    def __copy__(self):
+        return self.clone()
+
+    def __deepcopy__(self, memo):
+        return self.clone()
+
+    def __reduce__(self):
+        return _load_state, (self.clone(),)
+
+    def __getattr__(self, name):
+        # the attributes of the view itself (missing while a copy of it is built) and special methods aren't forwarded
+        if name.startswith('_StateView__') or name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        if self.__copy is None and name in self.__state.VIEW_SAFE_METHODS:
+            return getattr(self.__state, name)
+        self.detach()
+        return getattr(self.__copy, name)
+
+
+"""
+Unpickles a view as the copy of the state it was pickled with
+"""
+def _load_state(state):
+    return state
@@ -0,0 +1,47 @@
+class TimeControl:
+    """
+    Time limits of the players of a game, in milliseconds: a limit for each move, a clock for the whole game (shared
+    by all moves of a player), or both.
+
+    The simulator gives each player a budget before asking it for an action (see Player.get_time_budget). Players
+    that ignore it are not penalized: the time they take over their budget is only taken from their clock, so their
+    next budgets get smaller.
+    """
+
+    """
+    number of moves the remaining time of a game clock is expected to last
+    """
+    MOVES_TO_GO = 20
+
+    """
+    :param move_time: the time for each move (None for no limit)
+    :param game_time: the time of each player for the whole game (None for no limit)
+    """
+    def __init__(self, move_time=None, game_time=None):
+        self.__move_time = move_time
+        self.__game_time = game_time
+
+    def get_move_time(self):
+        return self.__move_time
+
+    def get_game_time(self):
+        return self.__game_time
+
+    """
+    Computes the time a player can spend on its next move
+    :param remaining_time: what is left of the game clock of the player (None if there is no game clock)
+    :return: the budget in milliseconds, or None if there is no limit
+    """
+    def get_budget(self, remaining_time=None):
+        budget = self.__move_time
+        if remaining_time is not None:
+            share = max(0, remaining_time) / TimeControl.MOVES_TO_GO
+            budget = share if budget is None else min(budget, share)
+        return budget
+
+
+class SearchTimeout(Exception):
+    """
+    Raised by a search when its deadline is reached, to abandon the iteration that is running
+    """
+    pass
@@ -0,0 +1,150 @@
+import struct
+
+
+"""
+the layouts of the value of an entry, as a float and as its bits (native, like the columns of the table)
+"""
+_VALUE = struct.Struct('d')
+_VALUE_BITS = struct.Struct('Q')
+
+
+class TranspositionTable:
+    """
+    Fixed-size cache of search results keyed by the hash of a position (see State.get_hash).
+
+    Each entry keeps the value of the position, the depth it was searched to, whether the value is exact or only a
+    lower/upper bound (when the search was cut off by alpha-beta) and the best action found. The entries live in
+    typed arrays over a single buffer, so the table takes the same memory however many positions are searched.
+
+    Positions are mapped to buckets of two entries: the first one keeps the deepest search of the positions of the
+    bucket (depth-preferred) and the second one keeps the last search that didn't fit in the first (always-replace).
+
+    The buffer can be shared by processes that search at the same time (e.g. a multiprocessing.shared_memory block),
+    without locks: each entry keeps its key xor-ed with the rest of the entry, so an entry that was read while another
+    process was writing it doesn't match its key and is treated as missing.
+    """
+
+    """
+    kinds of entries (an empty entry has the flag EMPTY)
+    """
+    EMPTY = 0
+    EXACT = 1
+    LOWER_BOUND = 2
+    UPPER_BOUND = 3
+
+    """
+    the action stored when there is no best action
+    """
+    NO_ACTION = -1
+
+    """
+    bytes per entry: key (8), value (8), depth (1), flag (1) and best action (1)
+    """
+    ENTRY_SIZE = 19
+
+    """
+    :param max_memory: the size of the table in bytes
+    :param buffer: the memory where the entries are kept (at least get_buffer_size(max_memory) bytes). If None, a new
+    buffer is allocated
+    """
+    def __init__(self, max_memory: int, buffer=None):
+        self.__num_buckets = max(1, max_memory // (2 * TranspositionTable.ENTRY_SIZE))
+        num_entries = 2 * self.__num_buckets
+
+        if buffer is None:
+            buffer = bytearray(TranspositionTable.get_buffer_size(max_memory))
+        memory = memoryview(buffer)
+        self.__memory = memory
+
+        """
+        the columns of the entries, laid out one after the other in the buffer (the 8-byte ones first, so they are
+        aligned)
+        """
+        self.__keys = memory[0:8 * num_entries].cast('Q')
+        self.__values = memory[8 * num_entries:16 * num_entries].cast('d')
+        self.__value_bits = memory[8 * num_entries:16 * num_entries].cast('Q')
+        self.__depths = memory[16 * num_entries:17 * num_entries].cast('b')
+        self.__flags = memory[17 * num_entries:18 * num_entries].cast('B')
+        self.__actions = memory[18 * num_entries:19 * num_entries].cast('b')
+
+        """
+        number of lookups and of lookups that found the position
+        """
+        self.__probes = 0
+        self.__hits = 0
+
+    """
+    Retrieves the number of bytes needed by the entries of a table with a size
+    """
+    @staticmethod
+    def get_buffer_size(max_memory: int) -> int:
+        return 2 * max(1, max_memory // (2 * TranspositionTable.ENTRY_SIZE)) * TranspositionTable.ENTRY_SIZE
+
+    def get_num_entries(self):
+        return 2 * self.__num_buckets
+
+    """
+    Looks up a position
+    :param key: the hash of the position
+    :return: a tuple (value, depth, flag, action) or None if the position isn't in the table
+    """
+    def probe(self, key: int):
+        self.__probes += 1
+        index = (key % self.__num_buckets) * 2
+        for slot in (index, index + 1):
+            value_bits, depth, flag, action = (self.__value_bits[slot], self.__depths[slot], self.__flags[slot],
+                                               self.__actions[slot])
+            if flag != TranspositionTable.EMPTY and \
+                    self.__keys[slot] == key ^ TranspositionTable.__get_check(value_bits, depth, flag, action):
+                self.__hits += 1
+                # the value is decoded from the bits that were checked (the slot may have been written since)
+                return _VALUE.unpack(_VALUE_BITS.pack(value_bits))[0], depth, flag, action
+        return None
+
+    """
+    mixes the fields of an entry (other than the key) into a 64-bit word
+    """
+    @staticmethod
+    def __get_check(value_bits, depth, flag, action):
+        return value_bits ^ (depth & 0xFF) << 8 ^ flag << 16 ^ (action & 0xFF) << 24
+
+    """
+    Stores the result of searching a position
+    :param key: the hash of the position
+    :param value: the value found by the search
+    :param depth: the depth of the search
+    :param flag: EXACT, LOWER_BOUND or UPPER_BOUND
+    :param action: the index of the best action, or NO_ACTION
+    """
+    def store(self, key: int, value, depth: int, flag: int, action: int = NO_ACTION):
+        slot = (key % self.__num_buckets) * 2
+        if self.__flags[slot] != TranspositionTable.EMPTY and self.__depths[slot] > depth and \
+                self.__keys[slot] != key ^ TranspositionTable.__get_check(self.__value_bits[slot], self.__depths[slot],
+                                                                          self.__flags[slot], self.__actions[slot]):
+            # the deeper search stays in the first entry of the bucket
+            slot += 1
+        self.__values[slot] = value
+        self.__depths[slot] = depth
+        self.__flags[slot] = flag
+        self.__actions[slot] = action
+        self.__keys[slot] = key ^ TranspositionTable.__get_check(self.__value_bits[slot], depth, flag, action)
+
+    """
+    Releases the views of the table over its buffer, so the memory that holds it can be closed (the table can't be
+    used afterwards)
+    """
+    def release(self):
+        for view in (self.__keys, self.__values, self.__value_bits, self.__depths, self.__flags, self.__actions,
+                     self.__memory):
+            view.release()
+
+    def clear(self):
+        self.__flags[:] = bytes(len(self.__flags))
+        self.__probes = 0
+        self.__hits = 0
+
+    """
+    Retrieves the share of lookups that found the position
+    """
+    def get_hit_rate(self):
+        return self.__hits / self.__probes if self.__probes > 0 else 0
@@ -0,0 +1,27 @@
+import random
+
+"""
+seed of the generator of the keys, fixed so that a position gets the same hash in every process and run
+"""
+ZOBRIST_SEED = 0x2F0B5
+
+"""
+the keys generated so far, by number of keys
+"""
+__keys = {}
+
+
+"""
+Retrieves the random 64-bit keys used to hash the positions of a game with Zobrist hashing: the hash of a position is
+the xor of the keys of its features (e.g. one key per cell and player), so it is updated with a single xor when a
+feature is added or removed. The keys are generated once per size with their own generator, so the global random
+state isn't affected
+:param num_keys: the number of features
+"""
+def get_zobrist_keys(num_keys: int) -> list:
+    keys = __keys.get(num_keys)
+    if keys is None:
+        generator = random.Random(ZOBRIST_SEED)
+        keys = [generator.getrandbits(64) for _i in range(num_keys)]
+        __keys[num_keys] = keys
+    return keys
@@ -1,41 +1,91 @@
 import argparse
+import contextlib
 import itertools
+import math
+import os
+import random
+import time
+import zlib
 from collections import namedtuple, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
+from checkpoint import clear_checkpoints, get_checkpoint_path, get_work_id, load_checkpoint, save_checkpoint
 from constants import AVAILABLE_GAME_TYPES, AVAILABLE_PLAYER_TYPES
+from games.lazy_smp import LazySMP
+from games.result_log import ResultLogWriter
+from games.time_control import TimeControl
+
+# settings of the sequential probability ratio test used to stop a match early
+SPRT = namedtuple('SPRT', ['alpha', 'beta', 'effect'])
+
+# minimum number of games before the sequential test is allowed to stop a match
+SPRT_MIN_GAMES = 20
+
+# number of stages in which a global budget of iterations is spent (the first one is split evenly between matches)
+BUDGET_STAGES = 4
+
+# z-score of the confidence intervals shown in the cross table
+CONFIDENCE_Z = 1.96
+
+# minimum number of seconds between two checkpoints of the same shard
+CHECKPOINT_INTERVAL = 60
+
+# extension of the game result logs written by each shard
+RESULT_LOG_EXTENSION = '.results'
+
+# maximum number of tiebreak iterations played after a drawn match (players that always split their games, like two
+# deterministic players that each win with the first move, would otherwise never stop)
+MAX_TIEBREAK_ITERATIONS = 100
+
+# maximum number of backtracking steps when looking for swiss pairings without repeated matches
+SWISS_PAIRING_STEPS = 10000
 
 
 def run_simulation(game_settings):
     removed_players = []
 
+    # the global score of every match that was played, so it is not replayed in the next elimination rounds
+    match_cache = {}
+
     while len(game_settings['players']) > 1:
         scores = defaultdict(int)
         match_results = defaultdict(dict)
+        match_games = defaultdict(dict)
 
-        for player1, player2 in itertools.combinations(game_settings['players'], 2):
-            simulator = game_settings['game']([player1, player2])
-            print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+        if game_settings['replay_matches']:
+            match_cache.clear()
 
-            names = {player1.get_name(): player1, player2.get_name(): player2}
+        pairings = list(itertools.combinations(game_settings['players'], 2))
+        new_pairings = [pairing for pairing in pairings if get_match_key(game_settings, *pairing) not in match_cache]
 
-            # Run initial iterations with progress bar
-            for _ in tqdm(range(game_settings['num_iterations']), desc="Running iterations"):
-                run_game_iteration(simulator, game_settings['seat_permutation'])
+        if game_settings['budget'] is None:
+            played_pairings = play_pairings(game_settings, new_pairings)
+        else:
+            played_pairings = play_pairings_with_budget(game_settings, new_pairings)
 
-            # Run additional iterations if there's a draw
-            while check_draw(simulator):
-                run_game_iteration(simulator, game_settings['seat_permutation'])
+        for (player1, player2), results in zip(new_pairings, played_pairings):
+            simulator = load_match(game_settings, player1, player2, results)
+            match_cache[get_match_key(game_settings, player1, player2)] = (simulator.get_global_score(),
+                                                                           simulator.get_num_games(),
+                                                                           get_confidence_intervals(simulator))
 
-            update_scores(scores, simulator, names)
+        for player1, player2 in pairings:
+            global_scores, num_games, intervals = match_cache[get_match_key(game_settings, player1, player2)]
 
-            # Update match results for cross table
-            update_match_results(match_results, simulator, player1, player2)
+            names = {player1.get_name(): player1, player2.get_name(): player2}
 
-            simulator.print_stats()
+            update_scores(scores, global_scores, names)
+
+            # Update match results for cross table
+            update_match_results(match_results, global_scores, player1, player2,
+                                 intervals if game_settings['budget'] is not None else None)
+            match_games[player1.get_name()][player2.get_name()] = num_games
+            match_games[player2.get_name()][player1.get_name()] = num_games
 
         # Print cross table and leaderboard before removing a player
         print_cross_table(match_results)
+        print_cross_table(match_games, title="Games Played")
         print_leaderboard(scores)
 
         removed_player = remove_worst_player(game_settings['players'], scores)
@@ -46,6 +96,441 @@ def run_simulation(game_settings):
     print_leaderboard(removed_players, final=True)
 
 
+def run_swiss(game_settings):
+    players = game_settings['players']
+
+    # the players are ranked by match points (a win is worth 1 and a draw 0.5), and then by their total score
+    points = {player: 0 for player in players}
+    scores = defaultdict(int)
+    match_results = defaultdict(dict)
+    match_games = defaultdict(dict)
+
+    played = set()
+    byes = set()
+
+    for round_number in range(1, game_settings['rounds'] + 1):
+        print(f"Swiss round {round_number}/{game_settings['rounds']}")
+        ranking = rank_swiss_players(players, points, scores)
+
+        # with an odd number of players, the lowest ranked player that didn't have a bye yet gets a free win
+        if len(ranking) % 2 == 1:
+            bye = next((player for player in reversed(ranking) if player not in byes), ranking[-1])
+            ranking.remove(bye)
+            byes.add(bye)
+            points[bye] += 1
+            print(f"Bye: {bye.get_name()}")
+
+        pairings = pair_swiss_round(ranking, played)
+
+        for (player1, player2), results in zip(pairings, play_pairings(game_settings, pairings)):
+            simulator = load_match(game_settings, player1, player2, results)
+            global_scores = simulator.get_global_score()
+            played.add(frozenset((player1, player2)))
+
+            names = {player1.get_name(): player1, player2.get_name(): player2}
+
+            update_scores(scores, global_scores, names)
+
+            # Update match results for cross table
+            update_match_results(match_results, global_scores, player1, player2)
+            update_match_games(match_games, simulator.get_num_games(), player1, player2)
+
+            score1, score2 = global_scores[player1.get_name()], global_scores[player2.get_name()]
+            points[player1] += 1 if score1 > score2 else 0.5 if score1 == score2 else 0
+            points[player2] += 1 if score2 > score1 else 0.5 if score1 == score2 else 0
+
+        print_cross_table(match_results)
+        print_cross_table(match_games, title="Games Played")
+        print_leaderboard(points)
+
+    print_leaderboard(rank_swiss_players(players, points, scores), final=True)
+
+
+def run_bracket(game_settings, max_losses):
+    # Knockout tournament where players are out after max_losses defeats (1 for single and 2 for double elimination).
+    # The players are seeded in the given order. Each round, the players with the same number of losses are paired
+    # best seed against worst seed (if they are odd, the best seed that didn't have a bye yet sits the round out), and
+    # all matches of the round are played at once. When no bracket has two players left, the remaining ones meet in
+    # the final.
+    players = game_settings['players']
+    losses = {player: 0 for player in players}
+    match_results = defaultdict(dict)
+    match_games = defaultdict(dict)
+    byes = set()
+
+    # players knocked out in each round, so the final standings can be sorted by how far they went
+    knocked_out = []
+
+    round_number = 0
+    while True:
+        active = [player for player in players if losses[player] < max_losses]
+        if len(active) <= 1:
+            break
+
+        brackets = [[player for player in active if losses[player] == num_losses] for num_losses in range(max_losses)]
+        if all(len(bracket) <= 1 for bracket in brackets):
+            brackets = [active]
+
+        round_number += 1
+        print(f"Bracket round {round_number}")
+
+        pairings = []
+        for bracket in brackets:
+            # byes go round the players, so the best seed doesn't skip every odd round
+            if len(bracket) % 2 == 1:
+                bye = next((player for player in bracket if player not in byes), bracket[0])
+                bracket = [player for player in bracket if player is not bye]
+                byes.add(bye)
+                print(f"Bye: {bye.get_name()}")
+            pairings.extend((bracket[index], bracket[-1 - index]) for index in range(len(bracket) // 2))
+
+        # rematches (e.g. a bracket reset in the final) must not replay the exact same games
+        round_settings = dict(game_settings, seed=derive_seed(game_settings['seed'], 'round', round_number))
+
+        round_knocked_out = []
+        for (player1, player2), results in zip(pairings, play_pairings(round_settings, pairings)):
+            simulator = load_match(game_settings, player1, player2, results)
+            global_scores = simulator.get_global_score()
+            update_match_results(match_results, global_scores, player1, player2)
+            update_match_games(match_games, simulator.get_num_games(), player1, player2)
+
+            # ties go to the best seed, which is always the first player
+            loser = player1 if global_scores[player1.get_name()] < global_scores[player2.get_name()] else player2
+            if global_scores[player1.get_name()] == global_scores[player2.get_name()]:
+                print(f"Drawn match: {player1.get_name()} goes through against {player2.get_name()} as the best seed")
+            losses[loser] += 1
+            if losses[loser] >= max_losses:
+                round_knocked_out.append(loser)
+
+        knocked_out.append(sorted(round_knocked_out, key=players.index))
+
+    print_cross_table(match_results)
+    print_cross_table(match_games, title="Games Played")
+    print_leaderboard(active + [player for group in reversed(knocked_out) for player in group], final=True)
+
+
+def rank_swiss_players(players, points, scores):
+    # sorting is stable, so players that are still tied keep the order in which they were given
+    return sorted(players, key=lambda player: (points[player], scores[player]), reverse=True)
+
+
+def pair_swiss_round(ranking, played):
+    # Pairs each player, from the top of the ranking, with the best ranked opponent they haven't played yet. If that
+    # leaves players that can't be paired, it backtracks, and after too many steps it allows repeated matches.
+    steps = [SWISS_PAIRING_STEPS]
+
+    def search(remaining):
+        if not remaining:
+            return []
+
+        steps[0] -= 1
+        if steps[0] < 0:
+            return None
+
+        player = remaining[0]
+        for index in range(1, len(remaining)):
+            opponent = remaining[index]
+            if frozenset((player, opponent)) in played:
+                continue
+            pairings = search(remaining[1:index] + remaining[index + 1:])
+            if pairings is not None:
+                return [(player, opponent)] + pairings
+        return None
+
+    pairings = search(ranking)
+    if pairings is None:
+        pairings = [(ranking[index], ranking[index + 1]) for index in range(0, len(ranking), 2)]
+    return pairings
+
+
+def load_match(game_settings, player1, player2, results):
+    print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+
+    # the games were played by copies of the players, so we only load their results here
+    simulator = game_settings['game']([player1, player2])
+    simulator.add_results(results)
+    simulator.print_stats()
+    return simulator
+
+
+def get_match_key(game_settings, player1, player2):
+    # a match only has to be played again if any of the settings that affect its games change
+    return (player1.get_name(), player2.get_name(), game_settings['seed'], game_settings['num_iterations'],
+            game_settings['shards'], game_settings['seat_permutation'], game_settings['stop_rule'],
+            game_settings['budget'])
+
+
+def play_pairings(game_settings, pairings):
+    # Plays every pairing and yields its game results, in the same order as the pairings.
+    # The iterations of a pairing are split into shards, and with more than one worker the shards are sent to a
+    # process pool. Each shard is played by fresh player instances with its own seed, so the results do not depend
+    # on the number of workers.
+    game = game_settings['game']
+    seat_permutation = game_settings['seat_permutation']
+
+    tasks = []
+    for pairing in pairings:
+        player_specs = [(player.__class__, player.get_name()) for player in pairing]
+        seed = derive_seed(game_settings['seed'], *[player.get_name() for player in pairing])
+        shards = [get_shard(game_settings, player_specs, num_iterations, get_shard_seed(seed, shard))
+                  for shard, num_iterations in enumerate(split_iterations(game_settings['num_iterations'],
+                                                                          game_settings['shards']))]
+        tasks.append((player_specs, seed, shards))
+
+    workers = game_settings['workers']
+    if workers <= 1:
+        for player_specs, seed, shards in tasks:
+            results = [run_shard(*shard) for shard in shards]
+            yield resolve_draw(game, player_specs, results, seat_permutation, derive_seed(seed, 'draw'),
+                               game_settings['time_control'], game_settings['workers'] <= 1)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [[executor.submit(run_shard, *shard, show_progress=False) for shard in shards]
+                   for _player_specs, _seed, shards in tasks]
+        for (player_specs, seed, _shards), shard_futures in zip(tasks, futures):
+            results = [future.result() for future in shard_futures]
+            yield resolve_draw(game, player_specs, results, seat_permutation, derive_seed(seed, 'draw'),
+                               game_settings['time_control'], game_settings['workers'] <= 1)
+
+
+def play_pairings_with_budget(game_settings, pairings):
+    # Plays every pairing within a global budget of iterations and yields its game results, in the same order as the
+    # pairings. The budget is spent in stages: the first one is split evenly, and each of the next ones gives more
+    # iterations to the matches whose winner is less certain. Each stage is played as a new shard of every match.
+    game = game_settings['game']
+    seat_permutation = game_settings['seat_permutation']
+
+    player_specs = [[(player.__class__, player.get_name()) for player in pairing] for pairing in pairings]
+    seeds = [derive_seed(game_settings['seed'], *[player.get_name() for player in pairing]) for pairing in pairings]
+
+    # the simulators only accumulate the results of the shards of each match
+    simulators = [game([player_class(name) for player_class, name in specs]) for specs in player_specs]
+    num_shards = [0] * len(pairings)
+
+    remaining = game_settings['budget']
+    stage_size = max(len(pairings), remaining // BUDGET_STAGES)
+    allocation = split_iterations(stage_size, len(pairings))
+
+    workers = game_settings['workers']
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as executor:
+        while True:
+            shards = []
+            for index, num_iterations in enumerate(allocation):
+                if num_iterations > 0:
+                    shards.append((index, get_shard(game_settings, player_specs[index], num_iterations,
+                                                    get_shard_seed(seeds[index], num_shards[index]))))
+                    num_shards[index] += 1
+
+            for (index, _shard), results in zip(shards, run_shards(executor, [shard for _index, shard in shards])):
+                simulators[index].add_results(results)
+
+            remaining -= sum(allocation)
+            uncertainties = [get_match_uncertainty(simulator) for simulator in simulators]
+            if remaining <= 0 or sum(uncertainties) == 0:
+                break
+
+            allocation = allocate_iterations(min(stage_size, remaining), uncertainties)
+
+    for specs, seed, simulator in zip(player_specs, seeds, simulators):
+        yield resolve_draw(game, specs, [simulator.get_game_results()], seat_permutation, derive_seed(seed, 'draw'),
+                           game_settings['time_control'], game_settings['workers'] <= 1)
+
+
+def get_shard(game_settings, player_specs, num_iterations, seed):
+    # builds the arguments of run_shard, including the checkpoint file where the shard saves its progress, the
+    # log file where it writes the record of each game, the time limits of the players and whether they can search
+    # with several processes (only when the matches aren't already played by several workers)
+    shard = (game_settings['game'], player_specs, num_iterations, game_settings['seat_permutation'], seed,
+             game_settings['stop_rule'])
+
+    game, _player_specs, *settings = shard
+    keys = (game.__name__, [(player_class.__name__, name) for player_class, name in player_specs], *settings)
+
+    checkpoint = None
+    if game_settings['checkpoint'] is not None:
+        checkpoint = get_checkpoint_path(game_settings['checkpoint'], *keys)
+
+    result_log = None
+    if game_settings['result_log'] is not None:
+        result_log = os.path.join(game_settings['result_log'], get_work_id(*keys) + RESULT_LOG_EXTENSION)
+
+    return shard + (checkpoint, result_log, game_settings['time_control'], game_settings['workers'] <= 1)
+
+
+def run_shards(executor, shards):
+    # plays a list of shards, in the process pool if there is one, and returns their results in the same order
+    if executor is None:
+        return [run_shard(*shard) for shard in shards]
+
+    futures = [executor.submit(run_shard, *shard, show_progress=False) for shard in shards]
+    return [future.result() for future in futures]
+
+
+def get_match_uncertainty(simulator):
+    # share of the squared standard error in the squared mean score of the first player plus the squared standard
+    # error: it is close to 1 for close or noisy matches, and close to 0 for matches whose winner is clear
+    num_games = simulator.get_num_games()
+    name = simulator.get_players()[0].get_name()
+    mean = simulator.get_global_score()[name] / num_games
+    squared_error = simulator.get_score_variance()[name] / num_games
+    if squared_error == 0:
+        return 0
+    return squared_error / (mean ** 2 + squared_error)
+
+
+def allocate_iterations(num_iterations, weights):
+    # splits the iterations proportionally to the weights, handing out the rounding leftovers by largest remainder
+    total = sum(weights)
+    quotas = [num_iterations * weight / total for weight in weights]
+    allocation = [int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(weights)), key=lambda index: quotas[index] - allocation[index], reverse=True)
+    for index in by_remainder[:num_iterations - sum(allocation)]:
+        allocation[index] += 1
+    return allocation
+
+
+def get_confidence_intervals(simulator):
+    # half-width of the confidence interval of the total score of each player
+    num_games = simulator.get_num_games()
+    return {name: CONFIDENCE_Z * math.sqrt(num_games * variance)
+            for name, variance in simulator.get_score_variance().items()}
+
+
+def derive_seed(seed, *keys):
+    # derives a stable seed from another one (python's hash() is salted per process, so we can't use it)
+    if seed is None:
+        return None
+    return zlib.crc32(":".join(map(str, (seed,) + keys)).encode())
+
+
+def get_shard_seed(seed, shard):
+    # the first shard keeps the seed of the pairing, so a run without sharding is not affected
+    return seed if shard == 0 else derive_seed(seed, 'shard', shard)
+
+
+def split_iterations(num_iterations, num_shards):
+    # splits the iterations as evenly as possible, without empty shards
+    num_shards = max(1, min(num_shards, num_iterations))
+    return [num_iterations // num_shards + (1 if shard < num_iterations % num_shards else 0)
+            for shard in range(num_shards)]
+
+
+def run_shard(game, player_specs, num_iterations, seat_permutation, seed, stop_rule=None, checkpoint=None,
+              result_log=None, time_control=None, parallel_search=True, show_progress=True):
+    # seeding with None falls back to the system entropy, which also prevents forked workers from sharing a stream
+    random.seed(seed)
+    LazySMP.set_enabled(parallel_search)
+
+    simulator = game([player_class(name) for player_class, name in player_specs])
+    simulator.set_time_control(time_control)
+
+    # continue from the last checkpoint of the shard, if there is one
+    progress = load_checkpoint(checkpoint) if checkpoint is not None else None
+    if progress is not None:
+        simulator.add_results(progress['results'])
+        if progress['finished']:
+            return simulator.get_game_results()
+        random.setstate(progress['random_state'])
+        simulator.set_current_permutation(progress['permutation'])
+        simulator.set_simulator_state(progress['simulator_state'])
+
+    first_iteration = progress['iterations'] if progress is not None else 0
+    last_save = time.monotonic()
+
+    # when resuming, the log keeps the games of the checkpoint and drops the ones played after it
+    writer = None
+    if result_log is not None:
+        names = [name for _player_class, name in player_specs]
+        writer = ResultLogWriter(result_log, zlib.crc32(":".join(names).encode()), names,
+                                 simulator.get_num_games() if progress is not None else None)
+        simulator.set_result_sink(writer)
+
+    # Run initial iterations with progress bar (the number of iterations is only a cap when there is a stop rule)
+    for iteration in tqdm(range(first_iteration, num_iterations), desc="Running iterations",
+                          initial=first_iteration, total=num_iterations, disable=not show_progress):
+        run_game_iteration(simulator, seat_permutation)
+        if stop_rule is not None and is_match_decided(simulator, stop_rule):
+            break
+
+        if checkpoint is not None and time.monotonic() - last_save >= CHECKPOINT_INTERVAL:
+            if writer is not None:
+                writer.flush()
+            save_shard_checkpoint(checkpoint, simulator, iteration + 1, False)
+            last_save = time.monotonic()
+
+    if writer is not None:
+        writer.close()
+
+    if checkpoint is not None:
+        save_shard_checkpoint(checkpoint, simulator, num_iterations, True)
+
+    return simulator.get_game_results()
+
+
+def save_shard_checkpoint(checkpoint, simulator, iterations, finished):
+    # the players are not saved: the ones of the shard are rebuilt on resume, so this is only exact for players that
+    # don't keep state between games (the simulator saves what its next games depend on, like the order of a deck)
+    save_checkpoint(checkpoint, {
+        'iterations': iterations,
+        'results': simulator.get_game_results(),
+        'random_state': random.getstate(),
+        'permutation': simulator.get_current_permutation(),
+        'simulator_state': simulator.get_simulator_state(),
+        'finished': finished
+    })
+
+
+def is_match_decided(simulator, sprt):
+    # Two one-sided sequential probability ratio tests on the score per game of the first player, whose mean is
+    # assumed normal with the observed variance. Each one tests H0: mean = 0 (the players are even) against a winner,
+    # H1: mean = +effect * stddev for the first player and H1: mean = -effect * stddev for the second, for which the
+    # log-likelihood ratios are +-effect * total_score / stddev - num_games * effect^2 / 2. The tests have no lower
+    # boundary: H0 is never accepted, so even players play up to the cap. Under H0 the likelihood ratio of each
+    # test is a martingale with mean 1, so (Ville's inequality) it reaches 1 / alpha with a probability of at most
+    # alpha, however long the match is.
+    num_games = simulator.get_num_games()
+    if num_games < SPRT_MIN_GAMES:
+        return False
+
+    name = simulator.get_players()[0].get_name()
+    total_score = simulator.get_global_score()[name]
+    stddev = math.sqrt(simulator.get_score_variance()[name])
+
+    # every game had the same result, so there is nothing else to learn (unless they were all draws)
+    if stddev == 0:
+        return total_score != 0
+
+    drift = num_games * sprt.effect ** 2 / 2
+    first_llr = sprt.effect * total_score / stddev - drift
+    second_llr = -sprt.effect * total_score / stddev - drift
+    return first_llr >= math.log(1 / sprt.alpha) or second_llr >= math.log(1 / sprt.beta)
+
+
+def resolve_draw(game, player_specs, shard_results, seat_permutation, seed, time_control=None, parallel_search=True):
+    # merges the results of all shards into a single simulator, which also plays the tiebreak games (while the
+    # workers may still be playing the shards of other matches)
+    random.seed(seed)
+    LazySMP.set_enabled(parallel_search)
+
+    simulator = game([player_class(name) for player_class, name in player_specs])
+    simulator.set_time_control(time_control)
+    for results in shard_results:
+        simulator.add_results(results)
+
+    # Run additional iterations if there's a draw
+    for _iteration in range(MAX_TIEBREAK_ITERATIONS):
+        if not check_draw(simulator):
+            break
+        run_game_iteration(simulator, seat_permutation)
+    else:
+        if check_draw(simulator):
+            names = " vs ".join(name for _player_class, name in player_specs)
+            print(f"Match {names} is still drawn after {MAX_TIEBREAK_ITERATIONS} tiebreak iterations")
+
+    return simulator.get_game_results()
+
+
 def run_game_iteration(simulator, seat_permutation):
     simulator.run_simulation()
     if seat_permutation:
@@ -62,9 +547,8 @@ def check_draw(simulator):
     return False  # Not a draw
 
 
-def update_scores(scores, simulator, names):
+def update_scores(scores, global_scores, names):
     # Update global scores for each player
-    global_scores = simulator.get_global_score()
     for player_name, score in global_scores.items():
         scores[names[player_name]] += score
 
@@ -76,14 +560,27 @@ def remove_worst_player(players, scores):
     return lowest_score_player
 
 
-def update_match_results(match_results, simulator, player1, player2):
-    result = simulator.get_global_score()  # Assuming this method exists and returns the match result
-    match_results[player1.get_name()][player2.get_name()] = result[player1.get_name()]
-    match_results[player2.get_name()][player1.get_name()] = result[player2.get_name()]
+def update_match_results(match_results, global_scores, player1, player2, intervals=None):
+    # adds the score of a match to the scores of both players against each other, like update_match_games (with
+    # intervals, only used when each pair plays once, the score is shown with its interval instead)
+    for player, opponent in ((player1, player2), (player2, player1)):
+        result = global_scores[player.get_name()]
+        if intervals is not None:
+            result = f"{result:g} ± {intervals[player.get_name()]:.1f}"
+        else:
+            result += match_results[player.get_name()].get(opponent.get_name(), 0)
+        match_results[player.get_name()][opponent.get_name()] = result
+
+
+def update_match_games(match_games, num_games, player1, player2):
+    # adds the games of a match to the games played by both players against each other (a bracket can pair them twice)
+    for player, opponent in ((player1, player2), (player2, player1)):
+        match_games[player.get_name()][opponent.get_name()] = \
+            match_games[player.get_name()].get(opponent.get_name(), 0) + num_games
 
 
-def print_cross_table(match_results):
-    print("\nCross Table:")
+def print_cross_table(match_results, title="Cross Table"):
+    print(f"\n{title}:")
     player_names = sorted(match_results.keys())
     print(" " * 15 + " ".join(f"{name:<15}" for name in player_names))
     for name in player_names:
@@ -109,6 +606,25 @@ def print_leaderboard(players, final=False):
     print("=" * 60 + "\n")
 
 
+def prepare_checkpoint(parser, args):
+    # Returns the seed of the tournament. Checkpoints are only valid for the seed they were made with, so a random
+    # seed is chosen (and saved) when none is given, and a resumed tournament keeps the seed it started with.
+    tournament_checkpoint = os.path.join(args.checkpoint, 'tournament.checkpoint')
+
+    if args.resume:
+        tournament = load_checkpoint(tournament_checkpoint)
+        if tournament is None:
+            parser.error(f"There is no tournament to resume in '{args.checkpoint}'.")
+        if args.seed is not None and args.seed != tournament['seed']:
+            parser.error(f"The tournament in '{args.checkpoint}' was started with seed {tournament['seed']}.")
+        return tournament['seed']
+
+    clear_checkpoints(args.checkpoint)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    save_checkpoint(tournament_checkpoint, {'seed': seed})
+    return seed
+
+
 def main():
     # Define a namedtuple for a Player
     Player = namedtuple('Player', ['name', 'type'])
@@ -127,6 +643,64 @@ def main():
     parser.add_argument('--num-iterations', type=int, default=10000,
                         help='Number of iterations in the simulation. Defaults to 10000.')
 
+    # Seed for the random number generators (default: None, i.e. not reproducible)
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed used to derive the random seed of each match. Defaults to a random seed.')
+
+    # Number of worker processes (default: 1)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes used to play matches in parallel. Defaults to 1.')
+
+    # Number of shards each match is split into (default: 1)
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Number of independent shards the iterations of each match are split into. Defaults to 1.')
+
+    # Replay every match in each elimination round (default: False)
+    parser.add_argument('--replay-matches', action='store_true', default=False,
+                        help='Play all matches again in every elimination round instead of reusing their results. Defaults to False.')
+
+    # Rule used to stop a match (default: fixed)
+    parser.add_argument('--stop-rule', choices=['fixed', 'sprt'], default='fixed',
+                        help='Play every iteration (fixed) or stop a match once its winner is statistically settled (sprt). Defaults to fixed.')
+
+    # Settings of the sequential probability ratio test
+    parser.add_argument('--sprt-alpha', type=float, default=0.05,
+                        help='Probability of wrongly declaring the first player of a match the winner. Defaults to 0.05.')
+    parser.add_argument('--sprt-beta', type=float, default=0.05,
+                        help='Probability of wrongly declaring the second player of a match the winner. Defaults to 0.05.')
+    parser.add_argument('--sprt-effect', type=float, default=0.1,
+                        help='Difference in score per game to detect, in standard deviations. Defaults to 0.1.')
+
+    # Global budget of iterations (default: None, i.e. every match plays --num-iterations)
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Total number of iterations for all matches, given out to the matches with the least certain winner. Defaults to None.')
+
+    # Tournament format (default: elimination)
+    parser.add_argument('--format', choices=['elimination', 'swiss', 'bracket', 'double-bracket'], default='elimination',
+                        help='Round robin that removes the worst player after each round (elimination), swiss system (swiss), single elimination (bracket) or double elimination (double-bracket). Defaults to elimination.')
+
+    # Number of swiss rounds (default: log2 of the number of players, rounded up)
+    parser.add_argument('--rounds', type=int, default=None,
+                        help='Number of rounds of a swiss tournament. Defaults to log2 of the number of players, rounded up.')
+
+    # Folder where the progress of the tournament is saved (default: None, i.e. no checkpoints)
+    parser.add_argument('--checkpoint', default=None, metavar='FOLDER',
+                        help='Folder where the progress of the matches is periodically saved. Defaults to None.')
+
+    # Resume from the checkpoints (default: False)
+    parser.add_argument('--resume', action='store_true', default=False,
+                        help='Continue the tournament from the checkpoints in the --checkpoint folder. Defaults to False.')
+
+    # Folder where the result of each game is logged (default: None, i.e. no logs)
+    parser.add_argument('--result-log', default=None, metavar='FOLDER',
+                        help='Folder where each shard writes a compact binary record of every game. Defaults to None.')
+
+    # Time limits of the players (default: None, i.e. no limits)
+    parser.add_argument('--move-time', type=float, default=None, metavar='MS',
+                        help='Time each player can spend on a move, in milliseconds. Defaults to None.')
+    parser.add_argument('--game-time', type=float, default=None, metavar='MS',
+                        help='Time each player can spend on all of its moves of a game, in milliseconds. Defaults to None.')
+
     # Player argument. This should be specified at least twice.
     parser.add_argument('--player', action='append', nargs=2, metavar=('NAME', 'TYPE'),
                         help='Add a player with a name and type. Requires two values. This option should be specified at least twice.')
@@ -137,6 +711,51 @@ def main():
     if args.player is None or len(args.player) < 2:
         parser.error('At least two --player arguments are required.')
 
+    if args.workers < 1:
+        parser.error('The number of workers must be at least 1.')
+
+    if args.shards < 1:
+        parser.error('The number of shards must be at least 1.')
+
+    if not (0 < args.sprt_alpha < 1 and 0 < args.sprt_beta < 1):
+        parser.error('The SPRT error probabilities must be between 0 and 1.')
+
+    if args.sprt_effect <= 0:
+        parser.error('The SPRT effect size must be positive.')
+
+    if args.budget is not None and args.budget < 1:
+        parser.error('The budget must be at least 1 iteration.')
+
+    if args.budget is not None and args.stop_rule != 'fixed':
+        parser.error('A budget can only be used with the fixed stop rule.')
+
+    if args.budget is not None and args.format != 'elimination':
+        parser.error('A budget can only be used with the elimination format.')
+
+    # every match of the first round robin gets at least one iteration
+    num_pairings = len(args.player) * (len(args.player) - 1) // 2
+    if args.budget is not None and args.budget < num_pairings:
+        parser.error(f"The budget must be at least the number of matches ({num_pairings}).")
+
+    # a swiss tournament with more rounds would need repeated matches (with an odd number of players, one sits out)
+    max_rounds = len(args.player) - 1 + len(args.player) % 2
+    if args.rounds is None:
+        args.rounds = min(max_rounds, math.ceil(math.log2(len(args.player))))
+    if not 1 <= args.rounds <= max_rounds:
+        parser.error(f"The number of rounds must be between 1 and {max_rounds}.")
+
+    if args.move_time is not None and args.move_time <= 0 or args.game_time is not None and args.game_time <= 0:
+        parser.error('The time limits must be positive.')
+
+    if args.resume and args.checkpoint is None:
+        parser.error('--resume requires a --checkpoint folder.')
+
+    if args.checkpoint is not None:
+        args.seed = prepare_checkpoint(parser, args)
+
+    if args.result_log is not None:
+        os.makedirs(args.result_log, exist_ok=True)
+
     try:
         # Retrieve available player types for the selected game
         available_player_types = AVAILABLE_PLAYER_TYPES[args.game]
@@ -170,10 +789,28 @@ def main():
         'game': AVAILABLE_GAME_TYPES[args.game],
         'seat_permutation': args.seat_permutation,
         'num_iterations': args.num_iterations,
+        'seed': args.seed,
+        'workers': args.workers,
+        'shards': args.shards,
+        'replay_matches': args.replay_matches,
+        'checkpoint': args.checkpoint,
+        'result_log': args.result_log,
+        'budget': args.budget,
+        'rounds': args.rounds,
+        'stop_rule': SPRT(args.sprt_alpha, args.sprt_beta, args.sprt_effect) if args.stop_rule == 'sprt' else None,
+        'time_control': TimeControl(args.move_time, args.game_time)
+        if args.move_time is not None or args.game_time is not None else None,
         'players': players
     }
 
-    run_simulation(game_settings)
+    if args.format == 'swiss':
+        run_swiss(game_settings)
+    elif args.format == 'bracket':
+        run_bracket(game_settings, max_losses=1)
+    elif args.format == 'double-bracket':
+        run_bracket(game_settings, max_losses=2)
+    else:
+        run_simulation(game_settings)
 
 
 if __name__ == '__main__':
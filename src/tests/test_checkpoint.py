@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.simulator import Connect4Simulator
+from games.hlpoker.players.always_call import AlwaysCallHLPokerPlayer
+from games.hlpoker.players.random import RandomHLPokerPlayer
+from games.hlpoker.simulator import HLPokerSimulator
+
+
+class Interrupted(Exception):
+    pass
+
+
+class ResumeTest(unittest.TestCase):
+    """
+    A shard that is interrupted and resumed from its last checkpoint plays the same games as a shard that isn't
+    (with players that don't keep state between games)
+    """
+
+    NUM_ITERATIONS = 30
+
+    """
+    number of iterations played before the interruption
+    """
+    INTERRUPTED_AT = 12
+
+    SEED = 7
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def run_shard(self, game, player_specs, checkpoint=None):
+        results = main.run_shard(game, player_specs, ResumeTest.NUM_ITERATIONS, True, ResumeTest.SEED,
+                                 checkpoint=checkpoint, show_progress=False)
+        return list(results.as_dicts())
+
+    """
+    Plays a shard that is interrupted after INTERRUPTED_AT iterations, with a checkpoint after each one, and resumes it
+    """
+    def run_resumed_shard(self, game, player_specs):
+        checkpoint = os.path.join(self.directory.name, 'shard.checkpoint')
+        run_game_iteration = main.run_game_iteration
+        iterations = [0]
+
+        def run_interrupted_iteration(simulator, seat_permutation):
+            if iterations[0] == ResumeTest.INTERRUPTED_AT:
+                raise Interrupted()
+            iterations[0] += 1
+            run_game_iteration(simulator, seat_permutation)
+
+        with mock.patch.object(main, 'CHECKPOINT_INTERVAL', 0), \
+                mock.patch.object(main, 'run_game_iteration', run_interrupted_iteration):
+            with self.assertRaises(Interrupted):
+                self.run_shard(game, player_specs, checkpoint)
+
+        return self.run_shard(game, player_specs, checkpoint)
+
+    def assert_resume_is_exact(self, game, player_specs):
+        self.assertEqual(self.run_resumed_shard(game, player_specs), self.run_shard(game, player_specs))
+
+    def test_connect4(self):
+        self.assert_resume_is_exact(Connect4Simulator, [(RandomConnect4Player, 'a'), (RandomConnect4Player, 'b')])
+
+    def test_hlpoker(self):
+        # each game shuffles the deck left by the previous one, so the order of the deck has to be restored too
+        self.assert_resume_is_exact(HLPokerSimulator, [(RandomHLPokerPlayer, 'a'), (AlwaysCallHLPokerPlayer, 'b')])
+
+
+if __name__ == '__main__':
+    unittest.main()